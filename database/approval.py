@@ -0,0 +1,296 @@
+"""Auto-approval pengajuan peminjaman berbasis aturan.
+
+Semua pengajuan ``pending`` dalam jendela tanggal dievaluasi dalam satu
+batch, lalu yang lolos semua aturan disetujui lewat satu RPC
+``approve_loans_batch`` (satu transaksi per batch, lihat
+``database/migrations/0003_approve_loans_batch.sql``).
+
+Bisa dipanggil dari Admin Dashboard atau dijalankan sebagai job terjadwal:
+
+    python -m database.approval --days 7            # dry-run (default)
+    python -m database.approval --days 7 --apply    # tulis ke database
+"""
+
+import argparse
+from collections import Counter
+from datetime import date, timedelta
+
+from utils.config import (
+    AUTO_APPROVE_DAYS,
+    AUTO_APPROVE_RULES,
+    LAB_QUOTA,
+    LAB_QUOTA_DEFAULT,
+)
+from utils.helpers import format_periode
+from utils.intervals import IntervalIndex, daterange, loan_interval
+
+from .cache import invalidate
+from .queries import SlotTaken, fetch_all, filter_overlapping, slot_guard
+from .resilience import execute
+
+
+class BatchContext:
+    """State satu batch: slot terpakai, pinjaman user, dan kuota lab."""
+
+    def __init__(self, schedules, approved_loans, lab_quota=None, default_quota=0):
+        self.lab_quota = LAB_QUOTA if lab_quota is None else lab_quota
+        self.default_quota = default_quota
+        # (computer_id, tanggal) -> available
+        self.schedule = {
+            (s["computer_id"], str(s["loan_date"])[:10]): bool(s["available"])
+            for s in schedules
+        }
+        self.computers = IntervalIndex()
+        self.users = IntervalIndex()
+        self.lab_days = Counter()
+        for loan in approved_loans:
+            self.commit(loan)
+
+    def quota_for(self, location):
+        return self.lab_quota.get(location, self.default_quota)
+
+    def commit(self, loan):
+        """Catat pinjaman yang (akan) disetujui agar terlihat oleh aturan."""
+        start, end = loan_interval(loan)
+        self.computers.add(loan["computer_id"], start, end)
+        self.users.add(loan["user_id"], start, end)
+        for day in _days(loan):
+            self.lab_days[(_location(loan), day)] += 1
+
+
+def _location(loan):
+    return (loan.get("computers") or {}).get("location")
+
+
+def _days(loan):
+    return [
+        day.isoformat()
+        for day in daterange(
+            loan["loan_date"], loan.get("end_date") or loan["loan_date"]
+        )
+    ]
+
+
+# --- Aturan ---
+# Setiap aturan mengembalikan alasan (str) jika pengajuan TIDAK lolos, atau None.
+
+
+def rule_computer_free(loan, ctx):
+    computer_id = loan["computer_id"]
+    if not all(ctx.schedule.get((computer_id, day), False) for day in _days(loan)):
+        return "Komputer tidak tersedia pada jadwal"
+    if ctx.computers.overlaps(computer_id, *loan_interval(loan)):
+        return "Komputer sudah dipinjam user lain"
+    return None
+
+
+def rule_no_user_conflict(loan, ctx):
+    if ctx.users.overlaps(loan["user_id"], *loan_interval(loan)):
+        return "User sudah punya peminjaman disetujui di periode ini"
+    return None
+
+
+def rule_lab_quota(loan, ctx):
+    location = _location(loan)
+    quota = ctx.quota_for(location)
+    if quota and any(ctx.lab_days[(location, day)] >= quota for day in _days(loan)):
+        return f"Kuota {location} ({quota}) sudah penuh"
+    return None
+
+
+RULES = {
+    "computer_free": rule_computer_free,
+    "no_user_conflict": rule_no_user_conflict,
+    "lab_quota": rule_lab_quota,
+}
+
+
+def evaluate(loans, schedules, rules=None, lab_quota=None, default_quota=None):
+    """Evaluasi semua pengajuan pending sekaligus, tanpa menulis ke database.
+
+    ``loans`` berisi pinjaman ``pending`` dan ``approved`` dalam jendela.
+    Pending diproses urut ``id`` (siapa cepat dia dapat); pengajuan yang
+    lolos langsung dicatat ke konteks sehingga pengajuan berikutnya di
+    batch yang sama tidak bisa mengambil slot yang sama.
+    """
+    rule_names = AUTO_APPROVE_RULES if rules is None else rules
+    unknown = [name for name in rule_names if name not in RULES]
+    if unknown:
+        raise ValueError(f"Aturan tidak dikenal: {', '.join(unknown)}")
+
+    approved = [loan for loan in loans if loan["status"] == "approved"]
+    pending = sorted(
+        (loan for loan in loans if loan["status"] == "pending"),
+        key=lambda loan: loan["id"],
+    )
+    ctx = BatchContext(
+        schedules,
+        approved,
+        lab_quota=lab_quota,
+        default_quota=LAB_QUOTA_DEFAULT if default_quota is None else default_quota,
+    )
+
+    report = []
+    for loan in pending:
+        reasons = [
+            reason
+            for reason in (RULES[name](loan, ctx) for name in rule_names)
+            if reason
+        ]
+        if not reasons:
+            ctx.commit(loan)
+        report.append(
+            {
+                "loan_id": loan["id"],
+                "loan_date": str(loan["loan_date"])[:10],
+                "periode": format_periode(loan),
+                "computer": (loan.get("computers") or {}).get("name"),
+                "location": _location(loan),
+                "nim": (loan.get("users") or {}).get("nim"),
+                "name": (loan.get("users") or {}).get("name"),
+                "approve": not reasons,
+                "reasons": reasons,
+            }
+        )
+    return report
+
+
+def window_dates(days, start=None):
+    start = start or date.today()
+    return [(start + timedelta(days=i)).isoformat() for i in range(days)]
+
+
+def fetch_batch(client, dates):
+    """Ambil semua data satu batch: pinjaman pending/approved + jadwal.
+
+    Pinjaman multi-hari yang beririsan dengan jendela ikut diambil; jadwal
+    dan pinjaman approved diambil sampai hari pertama/terakhir pinjaman
+    terpanjang agar aturan melihat semua hari yang dicakup pengajuan.
+    Semua bacaan per halaman (``fetch_all``); baris yang terpotong
+    ``max-rows`` akan membuat aturan menilai dengan data tidak lengkap.
+    """
+    columns = (
+        "id, loan_date, end_date, start_time, end_time, status, user_id, "
+        "computer_id, computers(name, location), users(name, nim)"
+    )
+    first, last = min(dates), max(dates)
+
+    def window_loans():
+        query = filter_overlapping(client.table("loans").select(columns), first, last)
+        return query.in_("status", ["pending", "approved"]).order("id")
+
+    loans_data = fetch_all(window_loans)
+
+    schedule_first = min([first] + [str(loan["loan_date"])[:10] for loan in loans_data])
+    schedule_last = max([last] + [_days(loan)[-1] for loan in loans_data])
+
+    def extra_approved():
+        # Hanya approved: pending di luar jendela bukan bagian batch ini
+        query = filter_overlapping(
+            client.table("loans").select(columns), schedule_first, schedule_last
+        )
+        return query.eq("status", "approved").order("id")
+
+    def schedules_window():
+        return (
+            client.table("computer_schedule")
+            .select("computer_id, loan_date, available")
+            .gte("loan_date", schedule_first)
+            .lte("loan_date", schedule_last)
+            .order("loan_date")
+            .order("computer_id")
+        )
+
+    if (schedule_first, schedule_last) != (first, last):
+        seen = {loan["id"] for loan in loans_data}
+        loans_data += [
+            loan for loan in fetch_all(extra_approved) if loan["id"] not in seen
+        ]
+    schedules = fetch_all(schedules_window)
+    return loans_data, schedules
+
+
+def apply_report(client, report):
+    """Setujui semua pengajuan yang lolos dalam satu transaksi (RPC).
+
+    ``SlotTaken`` jika batch melanggar ``loans_no_double_booking`` (mis. ACC
+    manual bersamaan, atau aturan ``computer_free`` dimatikan); seluruh batch
+    dibatalkan oleh database.
+    """
+    loan_ids = [row["loan_id"] for row in report if row["approve"]]
+    if not loan_ids:
+        return []
+    try:
+        with slot_guard(
+            "Batch dibatalkan: ada pengajuan yang slotnya bentrok di komputer "
+            "yang sama"
+        ):
+            resp = execute(
+                client.rpc("approve_loans_batch", {"p_loan_ids": loan_ids}),
+                idempotent=False,
+            )
+    finally:
+        # RPC yang melewati deadline bisa tetap di-commit database
+        invalidate("loans", "computer_schedule")
+    return resp.data or []
+
+
+def run_auto_approval(client, days=None, dates=None, dry_run=True, rules=None):
+    """Jalankan satu pass auto-approval; kembalikan (report, id yang disetujui)."""
+    dates = dates or window_dates(days or AUTO_APPROVE_DAYS)
+    loans, schedules = fetch_batch(client, dates)
+    report = evaluate(loans, schedules, rules=rules)
+    approved_ids = [] if dry_run else apply_report(client, report)
+    return report, approved_ids
+
+
+def format_report(report):
+    """Ringkasan teks report untuk log job terjadwal."""
+    lines = []
+    for row in report:
+        mark = "ACC " if row["approve"] else "SKIP"
+        detail = "" if row["approve"] else " - " + "; ".join(row["reasons"])
+        lines.append(
+            f"[{mark}] #{row['loan_id']} {row['periode']} {row['computer']} "
+            f"({row['location']}) {row['name']} ({row['nim']}){detail}"
+        )
+    approve_count = sum(row["approve"] for row in report)
+    lines.append(f"{approve_count}/{len(report)} pengajuan lolos semua aturan.")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Auto-approval pengajuan pending")
+    parser.add_argument("--days", type=int, default=AUTO_APPROVE_DAYS)
+    parser.add_argument(
+        "--rules",
+        default=",".join(AUTO_APPROVE_RULES),
+        help="Daftar aturan dipisah koma: " + ", ".join(RULES),
+    )
+    parser.add_argument(
+        "--apply", action="store_true", help="Tulis ke database (default dry-run)"
+    )
+    args = parser.parse_args(argv)
+
+    from .connection import create_client_from_env
+
+    rules = [name.strip() for name in args.rules.split(",") if name.strip()]
+    try:
+        report, approved_ids = run_auto_approval(
+            create_client_from_env(),
+            days=args.days,
+            dry_run=not args.apply,
+            rules=rules,
+        )
+    except SlotTaken as exc:
+        print(f"{exc}. Tidak ada perubahan ditulis; jalankan ulang.")
+        raise SystemExit(1)
+    print(format_report(report))
+    if args.apply:
+        print(f"{len(approved_ids)} pengajuan disetujui.")
+    else:
+        print("Dry-run: tidak ada perubahan ditulis.")
+
+
+if __name__ == "__main__":
+    main()
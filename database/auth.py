@@ -0,0 +1,214 @@
+"""Gateway login di depan RPC cek password.
+
+Halaman memanggil cek password di setiap rerun, dan setiap RPC menjalankan
+hashing password di database. Gateway ini:
+
+- menyimpan hasil verifikasi yang berhasil selama ``AUTH_CACHE_TTL`` detik
+  (key berupa HMAC dari identitas + password, password tidak disimpan);
+  kredensial salah yang sama juga tidak dicek ulang selama ``BAD_TTL``;
+- membatasi jumlah RPC per NIM/nama admin dan per sesi Streamlit dalam
+  jendela ``AUTH_RATE_WINDOW`` detik;
+- setelah ``AUTH_FREE_FAILURES`` kegagalan, identitas/sesi dikunci dengan
+  backoff eksponensial hingga ``AUTH_BACKOFF_MAX`` detik.
+
+State disimpan di backend cache bersama (lihat ``database/cache.py``) agar
+batasan berlaku lintas worker. Key di-HMAC dengan ``AUTH_CACHE_SECRET``;
+tanpa secret itu dipakai kunci acak per proses, sehingga key tetap tidak bisa
+ditebak offline tetapi cache dan batasan login hanya berlaku per proses.
+Counter beban login terpisah dari metrics backend, lihat
+``get_auth_metrics()``.
+"""
+
+import hashlib
+import hmac
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+from utils.config import (
+    AUTH_BACKOFF_BASE,
+    AUTH_BACKOFF_MAX,
+    AUTH_CACHE_SECRET,
+    AUTH_CACHE_TTL,
+    AUTH_FREE_FAILURES,
+    AUTH_RATE_PER_ID,
+    AUTH_RATE_PER_SESSION,
+    AUTH_RATE_WINDOW,
+)
+
+from .cache import CACHE_NAMESPACE, CacheUnavailable, MemoryCache, get_cache
+from .connection import backend_guard
+from .queries import check_admin_password, check_user_password
+
+logger = logging.getLogger(__name__)
+
+# Kredensial salah yang sama (mis. rerun saat password masih salah) tidak
+# memanggil RPC lagi dan tidak menambah hitungan gagal selama ini
+BAD_TTL = 30
+
+# Kunci tanpa AUTH_CACHE_SECRET; tidak diketahui proses lain
+_PROCESS_SECRET = os.urandom(32)
+_process_secret_logged = False
+
+# Dipakai saat cache bersama mati: batasan tetap jalan, tapi per proses
+_local_cache = MemoryCache()
+
+
+class AuthThrottled(Exception):
+    """Percobaan login ditolak sementara (rate limit atau backoff)."""
+
+    def __init__(self, retry_after):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(
+            "Terlalu banyak percobaan login. "
+            f"Coba lagi dalam {self.retry_after} detik."
+        )
+
+
+# --- Metrics beban login (per proses) ---
+
+_metrics = {
+    "attempts": 0,
+    "cache_hits": 0,
+    "rpc_calls": 0,
+    "failures": 0,
+    "throttled": 0,
+    "locked": 0,
+}
+_metrics_lock = threading.Lock()
+
+
+def _record(name):
+    with _metrics_lock:
+        _metrics[name] += 1
+
+
+def get_auth_metrics():
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+# --- Gateway ---
+
+
+def _secret(cache):
+    """Kunci HMAC untuk key cache login di backend ``cache``."""
+    global _process_secret_logged
+    if AUTH_CACHE_SECRET:
+        return AUTH_CACHE_SECRET.encode("utf-8")
+    if not isinstance(cache, MemoryCache) and not _process_secret_logged:
+        _process_secret_logged = True
+        logger.warning(
+            "AUTH_CACHE_SECRET kosong: cache & batasan login hanya per proses. "
+            "Isi AUTH_CACHE_SECRET yang sama di semua worker untuk berbagi."
+        )
+    return _PROCESS_SECRET
+
+
+def _digest(secret, *parts):
+    message = "\0".join(parts).encode("utf-8")
+    return hmac.new(secret, message, hashlib.sha256).hexdigest()
+
+
+def _session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+
+def _subjects(secret, kind, identity):
+    """Pihak yang dibatasi: identitas yang dicoba dan sesi yang mencoba."""
+    subjects = [(f"{kind}:{_digest(secret, kind, identity)}", AUTH_RATE_PER_ID)]
+    session_id = _session_id()
+    if session_id:
+        subjects.append((f"session:{session_id}", AUTH_RATE_PER_SESSION))
+    return subjects
+
+
+def _verify(kind, identity, password, rpc):
+    _record("attempts")
+    try:
+        return _gateway(get_cache(), kind, identity, password, rpc)
+    except CacheUnavailable as exc:
+        logger.warning("Cache login tidak tersedia, batasan login per proses: %s", exc)
+        return _gateway(_local_cache, kind, identity, password, rpc)
+
+
+def _gateway(cache, kind, identity, password, rpc):
+    secret = _secret(cache)
+    prefix = f"{CACHE_NAMESPACE}:auth"
+    credential = _digest(secret, kind, identity, password)
+
+    # Login yang sudah terverifikasi tetap jalan walau identitasnya sedang
+    # diserang dari sesi lain
+    result = cache.get(f"{prefix}:ok:{credential}") or cache.get(
+        f"{prefix}:bad:{credential}"
+    )
+    if result is not None:
+        _record("cache_hits")
+        return result
+
+    subjects = _subjects(secret, kind, identity)
+    now = time.time()
+    for subject, _ in subjects:
+        locked_until = cache.get(f"{prefix}:lock:{subject}")
+        if locked_until and locked_until > now:
+            _record("locked")
+            raise AuthThrottled(locked_until - now)
+
+    window = int(now // AUTH_RATE_WINDOW)
+    for subject, limit in subjects:
+        count = cache.incr(
+            f"{prefix}:rate:{subject}:{window}", ttl=AUTH_RATE_WINDOW * 2
+        )
+        if limit and count > limit:
+            _record("throttled")
+            raise AuthThrottled((window + 1) * AUTH_RATE_WINDOW - now)
+
+    _record("rpc_calls")
+    result = rpc(identity, password) or {"valid": False}
+
+    if result.get("valid"):
+        cache.set(f"{prefix}:ok:{credential}", result, AUTH_CACHE_TTL)
+        for subject, _ in subjects:
+            cache.delete(f"{prefix}:fail:{subject}")
+        return result
+
+    _record("failures")
+    cache.set(f"{prefix}:bad:{credential}", result, BAD_TTL)
+    for subject, _ in subjects:
+        failures = cache.incr(f"{prefix}:fail:{subject}", ttl=AUTH_BACKOFF_MAX)
+        if failures > AUTH_FREE_FAILURES:
+            delay = min(
+                AUTH_BACKOFF_BASE * 2 ** (failures - AUTH_FREE_FAILURES - 1),
+                AUTH_BACKOFF_MAX,
+            )
+            cache.set(f"{prefix}:lock:{subject}", time.time() + delay, delay)
+    return result
+
+
+def verify_user(nim, password):
+    """Cek NIM + password lewat gateway; kembalikan dict ``{valid, id}``."""
+    return _verify("user", nim, password, check_user_password)
+
+
+def verify_admin(name, password):
+    """Cek nama admin + password lewat gateway; kembalikan dict ``{valid, name}``."""
+    return _verify("admin", name, password, check_admin_password)
+
+
+@contextmanager
+def login_guard():
+    """``backend_guard`` + pesan ramah saat percobaan login dibatasi."""
+    with backend_guard():
+        try:
+            yield
+        except AuthThrottled as exc:
+            st.warning(f"⏳ {exc}")
+            st.stop()
@@ -0,0 +1,365 @@
+"""Cache bersama lintas proses untuk data layer.
+
+Beberapa proses Streamlit di belakang load balancer memakai satu backend
+cache yang sama, sehingga warmup dan beban database tidak berlipat sesuai
+jumlah worker. Backend dipilih lewat ``CACHE_BACKEND``:
+
+- ``disk``   (default) file JSON di ``CACHE_DIR``, dipakai bersama semua
+  proses di satu host; juga pengganti lokal untuk Redis. Direktori harus
+  milik user proses dengan mode ``0700``; jika tidak, proses memakai cache
+  per proses (``memory``) agar user lokal lain tidak bisa menanam isi cache.
+- ``redis``  server Redis/kompatibel di ``REDIS_URL`` (butuh paket ``redis``).
+- ``memory`` dict per proses, untuk development.
+
+Key diberi versi per tabel (``loans``, ``computer_schedule``, ...). Setiap
+penulisan memanggil ``invalidate(tabel)`` yang menaikkan counter versi di
+backend bersama, sehingga proses lain otomatis membaca key baru.
+
+Salinan terakhir yang berhasil (tanpa versi) juga disimpan; saat backend
+tidak tersedia (``BackendUnavailable``) salinan itu yang disajikan.
+
+Sebaliknya, jika cache bersama yang mati (``CacheUnavailable``), data
+dibaca langsung dari database dan kegagalan hanya dicatat di log.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from utils.config import (
+    CACHE_BACKEND,
+    CACHE_DIR,
+    CACHE_STALE_TTL,
+    CACHE_TTL,
+    REDIS_URL,
+)
+
+from .resilience import BackendUnavailable, record
+
+logger = logging.getLogger(__name__)
+
+# Naikkan jika bentuk data yang di-cache berubah agar key lama tidak terbaca
+CACHE_NAMESPACE = "komlab:v1"
+
+# Batas tunggu Redis (detik); cache yang lambat tidak boleh menahan halaman
+REDIS_TIMEOUT = 1.0
+
+
+class CacheUnavailable(Exception):
+    """Backend cache bersama tidak bisa dihubungi."""
+
+
+class MemoryCache:
+    """Cache dict per proses."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires and expires < time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key, ttl=None):
+        with self._lock:
+            value, expires = self._data.get(key, (0, None))
+            if expires and expires < time.time():
+                value, expires = 0, None
+            if expires is None and ttl:
+                expires = time.time() + ttl
+            value = (value or 0) + 1
+            self._data[key] = (value, expires)
+            return value
+
+
+class DiskCache:
+    """Cache file JSON yang bisa dibaca/ditulis banyak proses sekaligus.
+
+    Tulis memakai file sementara + ``os.replace`` (atomik), ``incr`` memakai
+    lock berbasis ``os.mkdir`` agar jalan di Linux maupun Windows. Error disk
+    (penuh, izin) dilaporkan sebagai ``CacheUnavailable`` seperti Redis mati.
+    """
+
+    PRUNE_EVERY = 200
+
+    def __init__(self, directory):
+        self.directory = directory
+        with self._guard():
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            self._check_private()
+        self._writes = 0
+
+    @contextmanager
+    def _guard(self):
+        try:
+            yield
+        except OSError as exc:
+            raise CacheUnavailable(f"Disk cache {self.directory}: {exc}") from exc
+
+    def _check_private(self):
+        """Tolak direktori yang bisa ditulis/dibuat lebih dulu oleh user lain.
+
+        ``makedirs(exist_ok=True)`` menerima direktori yang sudah ada, dan
+        nama file key bisa ditebak, jadi pemilik dan mode harus dicek.
+        """
+        if os.name != "posix":
+            return
+        info = os.lstat(self.directory)
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.geteuid():
+            raise CacheUnavailable(
+                f"{self.directory} bukan direktori milik user proses ini"
+            )
+        if info.st_mode & 0o077:
+            # Direktori sendiri dari versi lama (mode bawaan umask): perketat
+            os.chmod(self.directory, 0o700)
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + ".json")
+
+    def _read(self, path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                item = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if item.get("expires") and item["expires"] < time.time():
+            return None
+        return item
+
+    def _write(self, path, value, ttl=None):
+        item = {"value": value, "expires": time.time() + ttl if ttl else None}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(item, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, key):
+        item = self._read(self._path(key))
+        return None if item is None else item["value"]
+
+    def set(self, key, value, ttl=None):
+        with self._guard():
+            self._write(self._path(key), value, ttl)
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def delete(self, key):
+        with self._guard():
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def incr(self, key, ttl=None):
+        with self._guard():
+            return self._incr(self._path(key), ttl)
+
+    def _incr(self, path, ttl):
+        lock_dir = path + ".lock"
+        deadline = time.time() + 5
+        while True:
+            try:
+                os.mkdir(lock_dir)
+                break
+            except FileExistsError:
+                # Lock basi (proses mati saat memegang lock) dibersihkan
+                if time.time() > deadline:
+                    try:
+                        os.rmdir(lock_dir)
+                    except OSError:
+                        pass
+                    deadline = time.time() + 5
+                time.sleep(0.005)
+        try:
+            item = self._read(path)
+            if item:
+                value, expires = item["value"] + 1, item["expires"]
+            else:
+                value, expires = 1, time.time() + ttl if ttl else None
+            self._write(path, value, expires - time.time() if expires else None)
+            return value
+        finally:
+            os.rmdir(lock_dir)
+
+    def prune(self):
+        """Hapus file yang sudah kedaluwarsa (best effort, error diabaikan)."""
+        now = time.time()
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            item = self._read(path)
+            try:
+                if item is None and os.path.getmtime(path) < now - 60:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+class RedisCache:
+    """Cache di server Redis (atau server lain yang kompatibel)."""
+
+    def __init__(self, url):
+        import redis
+
+        self._redis = redis.Redis.from_url(
+            url, socket_timeout=REDIS_TIMEOUT, socket_connect_timeout=REDIS_TIMEOUT
+        )
+        self._errors = redis.RedisError
+
+    @contextmanager
+    def _guard(self):
+        try:
+            yield
+        except self._errors as exc:
+            raise CacheUnavailable(f"Redis: {exc}") from exc
+
+    def get(self, key):
+        with self._guard():
+            raw = self._redis.get(key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        with self._guard():
+            self._redis.set(key, json.dumps(value), ex=ttl)
+
+    def delete(self, key):
+        with self._guard():
+            self._redis.delete(key)
+
+    def incr(self, key, ttl=None):
+        with self._guard():
+            value = self._redis.incr(key)
+            if value == 1 and ttl:
+                self._redis.expire(key, ttl)
+        return value
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_cache():
+    """Backend cache untuk proses ini (dibuat sekali)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if CACHE_BACKEND == "redis":
+                    _backend = RedisCache(REDIS_URL)
+                elif CACHE_BACKEND == "memory":
+                    _backend = MemoryCache()
+                else:
+                    try:
+                        _backend = DiskCache(CACHE_DIR)
+                    except CacheUnavailable as exc:
+                        logger.error("%s; memakai cache per proses", exc)
+                        _backend = MemoryCache()
+    return _backend
+
+
+def set_cache(backend):
+    """Ganti backend cache (mis. untuk job atau load test)."""
+    global _backend
+    _backend = backend
+
+
+def table_version(table):
+    return get_cache().get(f"{CACHE_NAMESPACE}:version:{table}") or 0
+
+
+def _cache_down(exc):
+    record("cache_errors")
+    logger.warning("Cache tidak tersedia, baca langsung dari database: %s", exc)
+
+
+def invalidate(*tables):
+    """Tandai data tabel berubah; semua proses akan membaca key versi baru.
+
+    Dipanggil setelah penulisan berhasil, jadi cache yang mati tidak boleh
+    menggagalkannya; proses lain bisa membaca data lama sampai ``CACHE_TTL``.
+    """
+    cache = get_cache()
+    try:
+        for table in tables:
+            cache.incr(f"{CACHE_NAMESPACE}:version:{table}")
+    except CacheUnavailable as exc:
+        record("cache_errors")
+        logger.error("Gagal invalidasi cache %s: %s", ", ".join(tables), exc)
+
+
+def cached(*tables, ttl=None):
+    """Decorator cache hasil fungsi data layer, di-key dengan versi ``tables``.
+
+    Argumen fungsi harus bisa di-``repr`` secara stabil (str, int, date).
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            name = f"{CACHE_NAMESPACE}:{func.__module__}.{func.__qualname__}"
+            call = f"{args!r}:{sorted(kwargs.items())!r}"
+            try:
+                versions = ".".join(str(table_version(table)) for table in tables)
+                key = f"{name}:{versions}:{call}"
+                value = cache.get(key)
+            except CacheUnavailable as exc:
+                _cache_down(exc)
+                return func(*args, **kwargs)
+            if value is None:
+                try:
+                    value = func(*args, **kwargs)
+                except BackendUnavailable:
+                    try:
+                        value = cache.get(f"{name}:stale:{call}")
+                    except CacheUnavailable as exc:
+                        _cache_down(exc)
+                        value = None
+                    if value is None:
+                        raise
+                    record("stale_served")
+                    return value
+                try:
+                    cache.set(key, value, ttl or CACHE_TTL)
+                    cache.set(f"{name}:stale:{call}", value, CACHE_STALE_TTL)
+                except CacheUnavailable as exc:
+                    _cache_down(exc)
+            return value
+
+        return wrapper
+
+    return decorator
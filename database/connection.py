@@ -1,9 +1,58 @@
-from supabase import create_client
+from contextlib import contextmanager
+
 import streamlit as st
 
+from utils.config import BACKEND_TIMEOUT, SUPABASE_KEY, SUPABASE_URL
+
+from .resilience import BackendUnavailable, is_degraded
+
+
+def create_client_from_env():
+    """Buat client Supabase dari .env, fallback ke st.secrets."""
+    # Diimpor di sini: supabase berat, halaman yang belum butuh data tidak
+    # perlu menanggungnya saat cold start
+    from supabase import ClientOptions, create_client
+
+    url, key = SUPABASE_URL, SUPABASE_KEY
+    if not url or not key:
+        url = st.secrets["supabase"]["url"]
+        key = st.secrets["supabase"]["key"]
+    # Timeout HTTP sebagai batas bawah; deadline per panggilan ada di resilience
+    options = ClientOptions(postgrest_client_timeout=BACKEND_TIMEOUT)
+    return create_client(url, key, options=options)
+
+
+_override = None
+
+
+def set_client(client):
+    """Pakai client lain (mis. ``tools/fakedb.py`` untuk load test); None = reset."""
+    global _override
+    _override = client
+
 
 @st.cache_resource
+def _shared_client():
+    return create_client_from_env()
+
+
 def get_client():
-    url = st.secrets["supabase"]["url"]
-    key = st.secrets["supabase"]["key"]
-    return create_client(url, key)
+    if _override is not None:
+        return _override
+    return _shared_client()
+
+
+def backend_notice():
+    """Peringatan sekali per halaman saat circuit breaker tidak tertutup."""
+    if is_degraded():
+        st.warning("⚠️ Server sedang lambat, data yang tampil mungkin belum terbaru.")
+
+
+@contextmanager
+def backend_guard():
+    """Tampilkan pesan ramah (bukan stack trace) jika backend tidak tersedia."""
+    try:
+        yield
+    except BackendUnavailable:
+        st.error("❌ Server database sedang tidak bisa dihubungi. Coba lagi sebentar.")
+        st.stop()
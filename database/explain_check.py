@@ -0,0 +1,265 @@
+"""Cek regresi query plan dengan EXPLAIN terhadap Postgres lokal/CI.
+
+Menerapkan migrasi, mengisi data sintetis dengan volume realistis, lalu
+menjalankan ``EXPLAIN (FORMAT JSON)`` untuk setiap bentuk query yang dipakai
+aplikasi (versi SQL dari query PostgREST di ``database/queries.py``).
+Query dianggap regresi jika melakukan Seq Scan pada tabel besar atau tidak
+memakai index yang diharapkan. Data sintetis di-rollback di akhir.
+
+    python -m database.explain_check --database-url postgresql://...
+
+Jangan dijalankan ke database produksi.
+"""
+
+import argparse
+import json
+import sys
+
+import psycopg2
+
+from utils.config import DATABASE_URL
+
+from .migrate import migrate
+
+# Tabel yang tidak boleh di-Seq Scan oleh query aplikasi
+LARGE_TABLES = {"loans", "computer_schedule"}
+
+OVERLAP = (
+    "loan_date <= current_date + 7 and "
+    "(end_date >= current_date or (end_date is null and loan_date >= current_date))"
+)
+
+QUERY_SHAPES = [
+    {
+        "name": "get_active_loans (Pengajuan: pinjaman aktif di jendela)",
+        "sql": f"""
+            select computer_id, user_id, status, loan_date, end_date, start_time, end_time
+            from loans
+            where {OVERLAP} and status in ('pending', 'approved')
+            order by id
+            limit 1000
+        """,
+        "expect": {"loans_active_period_idx", "loans_period_idx"},
+    },
+    {
+        "name": "get_user_loans_overlapping (Pengajuan: cek pengajuan ganda)",
+        "sql": f"""
+            select loan_date, end_date, start_time, end_time
+            from loans
+            where user_id = %(user_id)s and {OVERLAP} and status <> 'rejected'
+        """,
+        "expect": {"loans_user_date_idx"},
+    },
+    {
+        "name": "get_user_loan_history (Daftar Peminjaman)",
+        "sql": """
+            select * from loans where user_id = %(user_id)s order by loan_date desc
+        """,
+        "expect": {"loans_user_date_idx"},
+    },
+    {
+        "name": "get_schedules (jadwal jendela booking)",
+        "sql": """
+            select * from computer_schedule
+            where loan_date >= current_date and loan_date <= current_date + 7
+            order by loan_date, computer_id
+            limit 1000
+        """,
+        "expect": {"computer_schedule_date_idx"},
+    },
+    {
+        "name": "get_computer_schedules (Pengajuan: cek ulang saat kirim)",
+        "sql": """
+            select loan_date, available from computer_schedule
+            where computer_id = %(computer_id)s
+              and loan_date >= current_date + 1 and loan_date <= current_date + 1
+        """,
+        "expect": {"computer_schedule_computer_date_key"},
+    },
+    {
+        "name": "get_computer_loans (Pengajuan: cek ulang saat kirim)",
+        "sql": f"""
+            select status, loan_date, end_date, start_time, end_time
+            from loans
+            where computer_id = %(computer_id)s and {OVERLAP}
+              and status in ('pending', 'approved')
+        """,
+        "expect": {"loans_active_period_idx", "loans_period_idx"},
+    },
+    {
+        "name": "search_loans (Admin: cari nama mahasiswa)",
+        "sql": """
+            select l.id, l.loan_date, l.end_date, l.status, c.name, c.location,
+                   u.name, u.nim
+            from loans l
+            join users u on u.id = l.user_id
+            join computers c on c.id = l.computer_id
+            where u.name ilike '%%mahasiswa 1234%%'
+            order by l.loan_date, l.id
+            limit 20
+        """,
+        # ilike '%...%' hanya bisa memakai index trigram (pg_trgm); index
+        # pinjaman per user saja berarti users di-Seq Scan
+        "expect": {"users_name_trgm_idx"},
+    },
+    {
+        "name": "search_loans (Admin: semua pinjaman di tanggal terpilih)",
+        "sql": f"""
+            select l.id, l.loan_date, l.end_date, l.status, c.name, u.name
+            from loans l
+            join users u on u.id = l.user_id
+            join computers c on c.id = l.computer_id
+            where {OVERLAP.replace("loan_date", "l.loan_date").replace("end_date", "l.end_date")}
+            order by l.loan_date, l.id
+            limit 20
+        """,
+        "expect": {"loans_period_idx"},
+    },
+    {
+        "name": "search_loans (Admin: semua pending di rentang)",
+        "sql": f"""
+            select l.id, l.loan_date, l.end_date, l.status, c.name, u.name
+            from loans l
+            join users u on u.id = l.user_id
+            join computers c on c.id = l.computer_id
+            where l.status = 'pending'
+              and {OVERLAP.replace("loan_date", "l.loan_date").replace("end_date", "l.end_date")}
+            order by l.loan_date, l.id
+            limit 20
+        """,
+        "expect": {
+            "loans_status_date_idx",
+            "loans_active_period_idx",
+            "loans_period_idx",
+        },
+    },
+    {
+        "name": "approve_loan (tutup jadwal komputer)",
+        "sql": """
+            select * from computer_schedule
+            where computer_id = %(computer_id)s
+              and loan_date >= current_date and loan_date <= current_date + 2
+        """,
+        # Dengan rentang pendek planner boleh memilih index tanggal saja
+        "expect": {"computer_schedule_computer_date_key", "computer_schedule_date_idx"},
+    },
+]
+
+SEED_SQL = """
+insert into computers (name, location)
+select 'PC-' || lpad(i::text, 3, '0'),
+       (array['Lab Komputer Sains Data',
+              'Lab Komputer Rekayasa Keamanan Siber',
+              'Lab AI & Robotik'])[1 + i %% 3]
+from generate_series(1, %(computers)s) i;
+
+insert into users (nim, name, prodi, password_hash)
+select 'SEED' || i, 'Mahasiswa ' || i, 'Sains Data Terapan', 'x'
+from generate_series(1, %(users)s) i;
+
+insert into computer_schedule (computer_id, loan_date, available)
+select c.id, d::date, true
+from computers c,
+     generate_series(current_date - %(days)s, current_date + 7, interval '1 day') d
+on conflict do nothing;
+
+-- Satu pinjaman approved per komputer per hari (tidak melanggar exclusion
+-- constraint), ditambah riwayat pending/rejected/returned
+insert into loans (user_id, computer_id, loan_date, end_date, status)
+select first_user.id
+         + (s.computer_id * 31 + k * 7 + (s.loan_date - date '2000-01-01'))
+           %% %(users)s,
+       s.computer_id, s.loan_date, s.loan_date,
+       (array['approved', 'rejected', 'returned', 'pending'])[1 + k]
+from computer_schedule s
+cross join generate_series(0, 3) k
+cross join (select min(id) as id from users where nim like 'SEED%%') first_user
+where k > 0 or random() < 0.7;
+
+analyze computers;
+analyze users;
+analyze computer_schedule;
+analyze loans;
+"""
+
+
+def plan_nodes(plan):
+    """Semua node di plan JSON (rekursif)."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(cur, sql, params):
+    cur.execute("explain (format json) " + sql, params)
+    raw = cur.fetchone()[0]
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+    return list(plan_nodes(plan))
+
+
+def check_shape(cur, shape, params):
+    """Kembalikan (lolos, index yang dipakai, daftar masalah)."""
+    nodes = explain(cur, shape["sql"], params)
+    used = {node["Index Name"] for node in nodes if "Index Name" in node}
+    problems = [
+        f"Seq Scan pada {node['Relation Name']}"
+        for node in nodes
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES
+    ]
+    if not used & shape["expect"]:
+        problems.append(
+            "index yang diharapkan tidak dipakai: " + ", ".join(sorted(shape["expect"]))
+        )
+    return not problems, used, problems
+
+
+def run_check(conn, seed=True, computers=60, users=3000, days=365):
+    """Jalankan semua cek; data sintetis di-rollback setelahnya."""
+    results = []
+    try:
+        with conn.cursor() as cur:
+            if seed:
+                cur.execute(
+                    SEED_SQL, {"computers": computers, "users": users, "days": days}
+                )
+            cur.execute("select min(id) from users")
+            user_id = cur.fetchone()[0]
+            cur.execute("select min(id) from computers")
+            computer_id = cur.fetchone()[0]
+            params = {"user_id": user_id, "computer_id": computer_id}
+            for shape in QUERY_SHAPES:
+                results.append((shape["name"], *check_shape(cur, shape, params)))
+    finally:
+        conn.rollback()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cek regresi query plan (EXPLAIN)")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument(
+        "--no-seed", action="store_true", help="Pakai data yang sudah ada"
+    )
+    parser.add_argument("--days", type=int, default=365, help="Hari riwayat sintetis")
+    args = parser.parse_args(argv)
+
+    conn = psycopg2.connect(args.database_url)
+    try:
+        migrate(conn, verbose=False)
+        results = run_check(conn, seed=not args.no_seed, days=args.days)
+    finally:
+        conn.close()
+
+    failed = 0
+    for name, ok, used, problems in results:
+        print(f"{'✅' if ok else '❌'} {name}")
+        print(f"    index: {', '.join(sorted(used)) or '-'}")
+        for problem in problems:
+            print(f"    {problem}")
+        failed += not ok
+    print(f"{len(results) - failed}/{len(results)} query shape lolos.")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
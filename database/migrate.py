@@ -0,0 +1,87 @@
+"""Jalankan migrasi SQL di ``database/migrations`` secara berurutan.
+
+Setiap file dijalankan sekali dalam transaksinya sendiri dan dicatat di
+tabel ``schema_migrations``:
+
+    python -m database.migrate                 # terapkan yang belum
+    python -m database.migrate --status        # lihat status saja
+"""
+
+import argparse
+import os
+
+import psycopg2
+
+from utils.config import DATABASE_URL
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+
+
+def migration_files():
+    """Daftar (versi, path) urut nama file, mis. ``0001_base_schema``."""
+    return [
+        (name[:-4], os.path.join(MIGRATIONS_DIR, name))
+        for name in sorted(os.listdir(MIGRATIONS_DIR))
+        if name.endswith(".sql")
+    ]
+
+
+def applied_versions(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            create table if not exists schema_migrations (
+              version text primary key,
+              applied_at timestamptz not null default now()
+            )
+            """)
+        cur.execute("select version from schema_migrations")
+        versions = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    return versions
+
+
+def migrate(conn, verbose=True):
+    """Terapkan semua migrasi yang belum ada; kembalikan versi yang diterapkan."""
+    done = applied_versions(conn)
+    applied = []
+    for version, path in migration_files():
+        if version in done:
+            continue
+        with open(path, encoding="utf-8") as f:
+            sql = f.read()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+                cur.execute(
+                    "insert into schema_migrations (version) values (%s)", (version,)
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+        if verbose:
+            print(f"✅ {version}")
+    return applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrasi skema database")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--status", action="store_true", help="Tampilkan status saja")
+    args = parser.parse_args(argv)
+
+    conn = psycopg2.connect(args.database_url)
+    try:
+        if args.status:
+            done = applied_versions(conn)
+            for version, _ in migration_files():
+                print(f"{'✅' if version in done else '⏳'} {version}")
+        elif not migrate(conn):
+            print("Tidak ada migrasi baru.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+-- Skema dasar tabel yang dipakai aplikasi.
+-- Hanya objek "if not exists", jadi aman dijalankan di database yang sudah ada.
+-- RPC cek password (check_user_password, check_admin_password) sengaja tidak
+-- dibuat di sini: fungsi itu sudah ada di database produksi dan tidak boleh
+-- ditimpa oleh migrasi.
+
+create table if not exists users (
+  id bigint generated by default as identity primary key,
+  nim text not null unique,
+  name text not null,
+  prodi text,
+  password_hash text not null
+);
+
+create table if not exists admins (
+  id bigint generated by default as identity primary key,
+  name text not null unique,
+  password_hash text not null
+);
+
+create table if not exists computers (
+  id bigint generated by default as identity primary key,
+  name text not null,
+  location text not null
+);
+
+create table if not exists computer_schedule (
+  id bigint generated by default as identity primary key,
+  computer_id bigint not null references computers (id) on delete cascade,
+  loan_date date not null,
+  available boolean not null default true,
+  user_id bigint references users (id) on delete set null
+);
+
+create table if not exists loans (
+  id bigint generated by default as identity primary key,
+  user_id bigint not null references users (id) on delete cascade,
+  computer_id bigint not null references computers (id) on delete cascade,
+  loan_date date not null,
+  status text not null default 'pending'
+    check (status in ('pending', 'approved', 'rejected', 'returned')),
+  created_at timestamptz not null default now()
+);
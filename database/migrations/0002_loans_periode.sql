@@ -0,0 +1,17 @@
+-- Booking multi-hari dan per jam.
+-- loan_date tetap tanggal mulai; end_date kosong = satu hari,
+-- start_time/end_time kosong = seharian penuh.
+alter table loans add column if not exists end_date date;
+alter table loans add column if not exists start_time time;
+alter table loans add column if not exists end_time time;
+
+-- Baris lama: isi end_date agar filter periode bisa memakai index
+update loans set end_date = loan_date where end_date is null;
+
+alter table loans drop constraint if exists loans_periode_check;
+alter table loans add constraint loans_periode_check check (
+  (end_date is null or end_date >= loan_date)
+  and ((start_time is null) = (end_time is null))
+  -- jam hanya untuk booking satu hari; multi-hari selalu seharian
+  and (start_time is null or coalesce(end_date, loan_date) = loan_date)
+);
@@ -0,0 +1,38 @@
+-- Setujui sekumpulan pengajuan dalam satu transaksi.
+-- Dipanggil oleh database/approval.py lewat supabase.rpc("approve_loans_batch").
+create or replace function approve_loans_batch(p_loan_ids bigint[])
+returns setof bigint
+language plpgsql
+as $$
+begin
+  return query
+  with approved as (
+    update loans l
+    set status = 'approved'
+    where l.id = any(p_loan_ids)
+      and l.status = 'pending'
+      -- jangan setujui jika slot sudah diambil sejak dry-run dievaluasi
+      and not exists (
+        select 1 from loans other
+        where other.computer_id = l.computer_id
+          and other.status = 'approved'
+          and other.loan_date <= coalesce(l.end_date, l.loan_date)
+          and coalesce(other.end_date, other.loan_date) >= l.loan_date
+          and (other.loan_date + coalesce(other.start_time, time '00:00'))
+              < (coalesce(l.end_date, l.loan_date) + coalesce(l.end_time, time '24:00'))
+          and (coalesce(other.end_date, other.loan_date) + coalesce(other.end_time, time '24:00'))
+              > (l.loan_date + coalesce(l.start_time, time '00:00'))
+      )
+    returning l.id, l.user_id, l.computer_id, l.loan_date, l.end_date, l.start_time
+  ), schedule as (
+    -- hanya booking seharian yang menutup jadwal harian komputer
+    update computer_schedule cs
+    set available = false, user_id = a.user_id
+    from approved a
+    where cs.computer_id = a.computer_id
+      and cs.loan_date between a.loan_date and coalesce(a.end_date, a.loan_date)
+      and a.start_time is null
+  )
+  select a.id from approved a;
+end;
+$$;
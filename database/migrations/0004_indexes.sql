@@ -0,0 +1,101 @@
+-- Index & constraint sesuai bentuk query aplikasi (lihat database/explain_check.py).
+create extension if not exists btree_gist;
+
+-- Pra-cek: alur ACC lama tidak mengecek bentrok, jadi data produksi bisa
+-- berisi jadwal ganda atau pinjaman approved yang beririsan. Keduanya membuat
+-- constraint di bawah gagal; migrasi berhenti di sini dengan jumlahnya.
+--
+-- Pembersihan (tinjau dulu hasilnya, jalankan manual, lalu ulangi migrasi):
+--
+--   -- Sisakan satu jadwal per (computer_id, loan_date); yang tidak tersedia
+--   -- (sudah dipinjam) dipertahankan, lalu id terkecil
+--   delete from computer_schedule cs
+--   using computer_schedule keep
+--   where keep.computer_id = cs.computer_id
+--     and keep.loan_date = cs.loan_date
+--     and (keep.available, keep.id) < (cs.available, cs.id);
+--
+--   -- Pinjaman approved yang bentrok dengan approved lain yang lebih dulu
+--   -- dibuat dikembalikan ke pending untuk diputuskan ulang oleh admin
+--   update loans l set status = 'pending'
+--   where l.status = 'approved'
+--     and exists (
+--       select 1 from loans o
+--       where o.computer_id = l.computer_id
+--         and o.status = 'approved'
+--         and o.id < l.id
+--         and tsrange(o.loan_date + coalesce(o.start_time, time '00:00'),
+--                     coalesce(o.end_date, o.loan_date) + coalesce(o.end_time, time '24:00'))
+--          && tsrange(l.loan_date + coalesce(l.start_time, time '00:00'),
+--                     coalesce(l.end_date, l.loan_date) + coalesce(l.end_time, time '24:00'))
+--     );
+do $$
+declare
+  duplicate_schedules bigint;
+  double_bookings bigint;
+begin
+  select count(*) into duplicate_schedules
+  from (
+    select 1 from computer_schedule
+    group by computer_id, loan_date
+    having count(*) > 1
+  ) d;
+
+  select count(*) into double_bookings
+  from loans a
+  join loans b
+    on b.computer_id = a.computer_id
+   and b.id > a.id
+   and b.status = 'approved'
+  where a.status = 'approved'
+    and tsrange(a.loan_date + coalesce(a.start_time, time '00:00'),
+                coalesce(a.end_date, a.loan_date) + coalesce(a.end_time, time '24:00'))
+     && tsrange(b.loan_date + coalesce(b.start_time, time '00:00'),
+                coalesce(b.end_date, b.loan_date) + coalesce(b.end_time, time '24:00'));
+
+  if duplicate_schedules > 0 or double_bookings > 0 then
+    raise exception
+      'Migrasi 0004: % jadwal ganda (computer_id, loan_date) dan % pasangan pinjaman approved yang bentrok',
+      duplicate_schedules, double_bookings
+      using hint = 'Jalankan langkah pembersihan di komentar 0004_indexes.sql, lalu ulangi migrasi.';
+  end if;
+end;
+$$;
+
+-- Jadwal: lookup (computer_id, loan_date) saat ACC, satu baris per komputer per hari
+alter table computer_schedule
+  drop constraint if exists computer_schedule_computer_date_key;
+alter table computer_schedule
+  add constraint computer_schedule_computer_date_key unique (computer_id, loan_date);
+
+-- Jadwal: rentang tanggal jendela booking untuk semua komputer
+create index if not exists computer_schedule_date_idx
+  on computer_schedule (loan_date);
+
+-- loans (user_id, loan_date): riwayat user order by loan_date desc dan
+-- cek pengajuan ganda (user_id + periode, status != rejected)
+create index if not exists loans_user_date_idx
+  on loans (user_id, loan_date) include (status);
+
+-- Pinjaman yang beririsan dengan rentang tanggal (Admin Dashboard):
+-- loan_date <= akhir and (end_date >= awal or (end_date is null and loan_date >= awal))
+create index if not exists loans_period_idx
+  on loans (end_date, loan_date);
+
+-- Sama, tapi hanya pinjaman aktif (Pengajuan & auto-approval);
+-- jauh lebih kecil karena riwayat rejected/returned tidak ikut
+create index if not exists loans_active_period_idx
+  on loans (end_date, loan_date)
+  where status in ('pending', 'approved');
+
+-- Tidak boleh ada dua pinjaman approved yang beririsan di komputer yang sama
+alter table loans drop constraint if exists loans_no_double_booking;
+alter table loans add constraint loans_no_double_booking
+  exclude using gist (
+    computer_id with =,
+    tsrange(
+      loan_date + coalesce(start_time, time '00:00'),
+      coalesce(end_date, loan_date) + coalesce(end_time, time '24:00')
+    ) with &&
+  )
+  where (status = 'approved');
@@ -0,0 +1,14 @@
+-- Pencarian pinjaman di Admin Dashboard (queries.search_loans):
+-- nama/NIM/komputer dicari dengan ilike '%...%', dibantu index trigram.
+create extension if not exists pg_trgm;
+
+create index if not exists users_name_trgm_idx
+  on users using gin (name gin_trgm_ops);
+create index if not exists users_nim_trgm_idx
+  on users using gin (nim gin_trgm_ops);
+create index if not exists computers_name_trgm_idx
+  on computers using gin (name gin_trgm_ops);
+
+-- Filter status saja (mis. semua pending) diurutkan per tanggal untuk halaman
+create index if not exists loans_status_date_idx
+  on loans (status, loan_date, id);
@@ -1,29 +1,350 @@
+from contextlib import contextmanager
+
+from utils.config import ADMIN_PAGE_SIZE, BACKEND_PAGE_ROWS
+
+from .cache import cached, invalidate
 from .connection import get_client
+from .resilience import execute
+
+LOAN_PERIOD_COLUMNS = "loan_date, end_date, start_time, end_time"
+
+# SQLSTATE exclusion_violation (loans_no_double_booking, migrasi 0004)
+EXCLUSION_VIOLATION = "23P01"
+
 
-supabase = get_client()
+class SlotTaken(Exception):
+    """Slot komputer sudah dipakai pinjaman lain yang disetujui."""
+
+
+@contextmanager
+def slot_guard(message):
+    """Ubah pelanggaran ``loans_no_double_booking`` menjadi ``SlotTaken``."""
+    # Impor malas, sama seperti resilience.is_transient
+    from postgrest.exceptions import APIError
+
+    try:
+        yield
+    except APIError as exc:
+        if exc.code != EXCLUSION_VIOLATION:
+            raise
+        raise SlotTaken(message) from exc
 
 
 def insert_loan(user_id, item_name, start_date, end_date):
-    return (
-        supabase.table("loans")
-        .insert(
-            {
-                "user_id": user_id,
-                "item_name": item_name,
-                "start_date": start_date,
-                "end_date": end_date,
-                "status": "dipinjam",
-            }
-        )
-        .execute()
-    )
+    try:
+        return execute(
+            get_client()
+            .table("loans")
+            .insert(
+                {
+                    "user_id": user_id,
+                    "item_name": item_name,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "status": "dipinjam",
+                }
+            ),
+            idempotent=False,
+        )
+    finally:
+        invalidate("loans")
 
 
 def get_all_loans():
-    return supabase.table("loans").select("*").execute()
+    return execute(get_client().table("loans").select("*"))
 
 
 def update_loan_status(loan_id, status):
-    return (
-        supabase.table("loans").update({"status": status}).eq("id", loan_id).execute()
+    try:
+        return execute(
+            get_client().table("loans").update({"status": status}).eq("id", loan_id),
+            idempotent=False,
+        )
+    finally:
+        invalidate("loans")
+
+
+def filter_overlapping(query, first, last):
+    """Filter pinjaman yang periodenya beririsan dengan tanggal [first, last].
+
+    ``end_date`` kosong berarti pinjaman satu hari di ``loan_date``.
+    ``first``/``last`` boleh None untuk rentang terbuka.
+    """
+    if last:
+        query = query.lte("loan_date", str(last))
+    if first:
+        query = query.or_(
+            f"end_date.gte.{first},and(end_date.is.null,loan_date.gte.{first})"
+        )
+    return query
+
+
+def fetch_all(build, page_size=None):
+    """Baca semua baris sebuah query, per halaman ``.range()``.
+
+    PostgREST memotong hasil di ``max-rows`` tanpa error, jadi halaman dibaca
+    sampai ada yang lebih pendek dari ``page_size``. ``build()`` membuat
+    query baru untuk setiap halaman (builder menumpuk parameter ``range``)
+    dan harus diurutkan pada kolom unik agar halaman tidak bergeser.
+    """
+    page_size = page_size or BACKEND_PAGE_ROWS
+    rows = []
+    while True:
+        start = len(rows)
+        page = execute(build().range(start, start + page_size - 1)).data or []
+        rows += page
+        if len(page) < page_size:
+            return rows
+
+
+def _contains(text):
+    """Pola ilike ``%text%``; wildcard dari input user di-escape."""
+    for char in ("\\", "%", "_"):
+        text = text.replace(char, "\\" + char)
+    return f"%{text.replace('*', '')}%"
+
+
+# --- Autentikasi & user ---
+
+
+def check_user_password(nim, password):
+    """RPC cek NIM + password; kembalikan dict ``{valid, id}`` atau None."""
+    return execute(
+        get_client().rpc("check_user_password", {"p_nim": nim, "p_password": password})
+    ).data
+
+
+def check_admin_password(name, password):
+    """RPC cek nama admin + password; kembalikan dict ``{valid, name}`` atau None."""
+    return execute(
+        get_client().rpc(
+            "check_admin_password", {"p_name": name, "p_password": password}
+        )
+    ).data
+
+
+@cached("users")
+def get_user_prodi(user_id):
+    data = execute(get_client().table("users").select("prodi").eq("id", user_id)).data
+    return data[0]["prodi"] if data else None
+
+
+# --- Katalog & ketersediaan (di-cache bersama, lihat database/cache.py) ---
+
+
+@cached("computers")
+def get_computers():
+    return execute(get_client().table("computers").select("*")).data
+
+
+@cached("computer_schedule")
+def get_schedules(first, last):
+    """Jadwal harian semua komputer untuk tanggal [first, last], per halaman."""
+    return fetch_all(
+        lambda: get_client()
+        .table("computer_schedule")
+        .select("*")
+        .gte("loan_date", str(first))
+        .lte("loan_date", str(last))
+        .order("loan_date")
+        .order("computer_id")
+    )
+
+
+@cached("loans")
+def get_active_loans(first, last):
+    """Pinjaman pending/approved yang beririsan dengan [first, last], per halaman."""
+    return fetch_all(
+        lambda: filter_overlapping(
+            get_client()
+            .table("loans")
+            .select(f"computer_id, user_id, status, {LOAN_PERIOD_COLUMNS}"),
+            first,
+            last,
+        )
+        .in_("status", ["pending", "approved"])
+        .order("id")
+    )
+
+
+def get_computer_schedules(computer_id, first, last):
+    """Jadwal harian satu komputer untuk [first, last], tanpa cache (cek saat kirim)."""
+    return execute(
+        get_client()
+        .table("computer_schedule")
+        .select("loan_date, available")
+        .eq("computer_id", computer_id)
+        .gte("loan_date", str(first))
+        .lte("loan_date", str(last))
+    ).data
+
+
+def get_computer_loans(computer_id, first, last):
+    """Pinjaman pending/approved satu komputer yang beririsan dengan [first, last],
+    tanpa cache (cek saat kirim)."""
+    return execute(
+        filter_overlapping(
+            get_client()
+            .table("loans")
+            .select(f"status, {LOAN_PERIOD_COLUMNS}")
+            .eq("computer_id", computer_id),
+            first,
+            last,
+        ).in_("status", ["pending", "approved"])
+    ).data
+
+
+@cached("loans")
+def get_user_loan_history(user_id):
+    return execute(
+        get_client()
+        .table("loans")
+        .select(
+            f"{LOAN_PERIOD_COLUMNS}, status, computer_id, "
+            "computers(name, location), users(name, nim)"
+        )
+        .eq("user_id", user_id)
+        .order("loan_date", desc=True)
+    ).data
+
+
+@cached("loans", "users", "computers")
+def search_loans(
+    nim=None,
+    name=None,
+    computer=None,
+    lab=None,
+    statuses=None,
+    first=None,
+    last=None,
+    page=0,
+    per_page=ADMIN_PAGE_SIZE,
+):
+    """Cari pinjaman (join komputer & user) di server, per halaman.
+
+    Teks dicocokkan sebagian tanpa beda huruf besar/kecil (index trigram di
+    migrasi 0005). Kembalikan ``{"rows": [...], "total": n}``.
+    """
+    query = (
+        get_client()
+        .table("loans")
+        .select(
+            f"id, {LOAN_PERIOD_COLUMNS}, status, user_id, computer_id, "
+            "computers!inner(name, location), users!inner(name, nim)",
+            count="exact",
+        )
     )
+    if nim:
+        query = query.ilike("users.nim", _contains(nim.strip()))
+    if name:
+        query = query.ilike("users.name", _contains(name.strip()))
+    if computer:
+        query = query.ilike("computers.name", _contains(computer.strip()))
+    if lab:
+        query = query.eq("computers.location", lab)
+    if statuses:
+        query = query.in_("status", list(statuses))
+    query = filter_overlapping(query, first, last)
+
+    start = page * per_page
+    resp = execute(
+        query.order("loan_date", desc=False)
+        .order("id", desc=False)
+        .range(start, start + per_page - 1)
+    )
+    return {"rows": resp.data, "total": resp.count or 0}
+
+
+# --- Penulisan (selalu invalidasi cache tabel yang berubah) ---
+# Invalidasi di ``finally``: penulisan yang melewati deadline bisa tetap
+# sampai ke database walau ``execute`` sudah menyerah.
+
+
+def get_user_loans_overlapping(user_id, first, last):
+    """Pinjaman user (selain rejected) yang beririsan; selalu baca langsung."""
+    return execute(
+        filter_overlapping(
+            get_client()
+            .table("loans")
+            .select(LOAN_PERIOD_COLUMNS)
+            .eq("user_id", user_id),
+            first,
+            last,
+        ).neq("status", "rejected")
+    ).data
+
+
+def create_loan(
+    user_id, computer_id, start_date, end_date, start_time=None, end_time=None
+):
+    try:
+        resp = execute(
+            get_client()
+            .table("loans")
+            .insert(
+                {
+                    "user_id": user_id,
+                    "computer_id": computer_id,
+                    "loan_date": str(start_date),
+                    "end_date": str(end_date),
+                    "start_time": start_time.isoformat() if start_time else None,
+                    "end_time": end_time.isoformat() if end_time else None,
+                    "status": "pending",
+                }
+            ),
+            idempotent=False,
+        )
+    finally:
+        invalidate("loans")
+    return resp.data
+
+
+def approve_loan(loan):
+    """Setujui pinjaman dan tutup jadwal harian komputer (booking seharian).
+
+    Booking per jam tidak menutup jadwal harian; slot-nya dicek lewat
+    indeks interval dari tabel loans. ``SlotTaken`` jika periodenya beririsan
+    dengan pinjaman approved lain di komputer yang sama. Hanya pinjaman yang
+    masih ``pending`` yang diubah; kembalikan False jika sudah diproses
+    (mis. admin lain menekan ACC lebih dulu).
+    """
+    client = get_client()
+    try:
+        with slot_guard("Komputer sudah disetujui untuk peminjaman lain"):
+            resp = execute(
+                client.table("loans")
+                .update({"status": "approved"})
+                .eq("id", loan["id"])
+                .eq("status", "pending"),
+                idempotent=False,
+            )
+        if not resp.data:
+            return False
+
+        if not loan.get("start_time"):
+            start = str(loan["loan_date"])[:10]
+            end = str(loan.get("end_date") or loan["loan_date"])[:10]
+            execute(
+                client.table("computer_schedule")
+                .update({"available": False, "user_id": loan["user_id"]})
+                .eq("computer_id", loan["computer_id"])
+                .gte("loan_date", start)
+                .lte("loan_date", end),
+                idempotent=False,
+            )
+        return True
+    finally:
+        invalidate("loans", "computer_schedule")
+
+
+def reject_loan(loan_id):
+    try:
+        execute(
+            get_client()
+            .table("loans")
+            .update({"status": "rejected"})
+            .eq("id", loan_id),
+            idempotent=False,
+        )
+    finally:
+        invalidate("loans")
@@ -0,0 +1,242 @@
+"""Lapisan resiliensi untuk semua panggilan ke Supabase/PostgREST.
+
+Setiap ``.execute()`` di data layer lewat ``execute(query)``:
+
+- deadline per panggilan (``BACKEND_TIMEOUT`` detik) dihitung sejak request
+  benar-benar dikirim, bukan sejak masuk antrian pool lokal; panggilan yang
+  lewat batas dianggap gagal walau request-nya masih berjalan di thread lain
+  (dibatasi timeout HTTP client yang sama);
+- panggilan yang tidak sempat dikirim karena pool lokal
+  (``BACKEND_WORKERS`` thread) penuh ditolak tanpa dihitung sebagai
+  kegagalan backend;
+- retry dengan jitter (tenacity) hanya untuk panggilan idempoten (read/RPC
+  cek password), penulisan dicoba sekali;
+- semua percobaan satu panggilan berbagi anggaran waktu ``BACKEND_BUDGET``
+  detik: deadline percobaan berikutnya dipotong ke sisa anggaran, jadi
+  backend yang menggantung tidak menahan halaman ``attempts`` x deadline;
+- circuit breaker: setelah ``BREAKER_FAILURES`` kegagalan beruntun semua
+  panggilan langsung ditolak selama ``BREAKER_RESET`` detik, lalu satu
+  panggilan percobaan (half-open) menentukan apakah breaker ditutup lagi.
+
+Kegagalan dilaporkan sebagai ``BackendUnavailable``; fungsi yang di-cache
+(lihat ``database/cache.py``) lalu menyajikan data terakhir yang berhasil.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from tenacity import (
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_after_delay,
+    wait_random_exponential,
+)
+
+from utils.config import (
+    BACKEND_BUDGET,
+    BACKEND_RETRIES,
+    BACKEND_TIMEOUT,
+    BACKEND_WORKERS,
+    BREAKER_FAILURES,
+    BREAKER_RESET,
+)
+
+
+class BackendUnavailable(Exception):
+    """Backend tidak bisa dihubungi (timeout, error jaringan, breaker terbuka)."""
+
+
+class DeadlineExceeded(Exception):
+    """Panggilan melewati deadline."""
+
+
+# --- Metrics (per proses) ---
+
+_metrics = {
+    "calls": 0,
+    "retries": 0,
+    "failures": 0,
+    "timeouts": 0,
+    "queue_timeouts": 0,
+    "rejected_open": 0,
+    "stale_served": 0,
+}
+_metrics_lock = threading.Lock()
+
+
+def record(name, amount=1):
+    with _metrics_lock:
+        _metrics[name] = _metrics.get(name, 0) + amount
+
+
+def get_metrics():
+    """Snapshot counter dan status breaker untuk ditampilkan di dashboard."""
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+    snapshot["breaker_state"] = breaker.state
+    snapshot["breaker_failures"] = breaker.failures
+    return snapshot
+
+
+# --- Circuit breaker ---
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """Boleh memanggil backend? Saat half-open hanya satu panggilan percobaan."""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def release(self):
+        """Kembalikan izin ``allow()`` yang tidak jadi dipakai (tanpa hasil)."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+breaker = CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET)
+
+
+def is_degraded():
+    """True jika breaker tidak tertutup (backend sedang bermasalah)."""
+    return breaker.state != CircuitBreaker.CLOSED
+
+
+# --- Eksekusi ---
+
+# Thread terpisah agar deadline bisa ditegakkan tanpa menunggu request selesai.
+# Satu pool per proses dipakai semua sesi: ukur sesuai jumlah sesi bersamaan.
+_executor = ThreadPoolExecutor(
+    max_workers=BACKEND_WORKERS, thread_name_prefix="backend"
+)
+
+# SQLSTATE/HTTP yang dianggap sementara: koneksi putus, query dibatalkan,
+# server/gateway error
+_TRANSIENT_CODES = ("08", "57P", "57014", "500", "502", "503", "504")
+
+
+def is_transient(exc):
+    # Impor malas; modul ini dimuat halaman sebelum client dibuat
+    import httpx
+    from postgrest.exceptions import APIError
+
+    if isinstance(exc, (DeadlineExceeded, httpx.TransportError)):
+        return True
+    if isinstance(exc, APIError):
+        return str(exc.code or "").startswith(_TRANSIENT_CODES)
+    return False
+
+
+def _attempt(query, deadline):
+    if not breaker.allow():
+        record("rejected_open")
+        raise BackendUnavailable("Circuit breaker terbuka")
+    started = threading.Event()
+
+    def call():
+        started.set()
+        return query.execute()
+
+    future = _executor.submit(call)
+    # Antri di pool lokal bukan tanda backend lambat: jangan sentuh breaker
+    if not started.wait(timeout=deadline) and future.cancel():
+        record("queue_timeouts")
+        breaker.release()
+        raise BackendUnavailable("Antrian panggilan backend di server aplikasi penuh")
+    try:
+        result = future.result(timeout=deadline)
+    except FutureTimeout:
+        record("timeouts")
+        breaker.record_failure()
+        raise DeadlineExceeded(f"Melewati deadline {deadline} detik")
+    except Exception as exc:
+        # Error non-sementara berarti backend menjawab, jadi tetap dihitung sehat
+        if is_transient(exc):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        raise
+    breaker.record_success()
+    return result
+
+
+def execute(query, idempotent=True, deadline=None, attempts=None, budget=None):
+    """Jalankan query builder PostgREST dengan deadline, retry, dan breaker.
+
+    ``budget`` membatasi total waktu semua percobaan (default ``BACKEND_BUDGET``).
+    Error non-sementara (mis. constraint violation) diteruskan apa adanya;
+    error sementara yang tetap gagal setelah retry menjadi ``BackendUnavailable``.
+    """
+    deadline = deadline or BACKEND_TIMEOUT
+    attempts = (attempts or BACKEND_RETRIES) if idempotent else 1
+    budget = budget or BACKEND_BUDGET
+    give_up_at = time.monotonic() + budget
+    record("calls")
+
+    def attempt():
+        remaining = give_up_at - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Melewati anggaran waktu {budget} detik")
+        return _attempt(query, min(deadline, remaining))
+
+    def before_sleep(retry_state):
+        record("retries")
+
+    retrying = Retrying(
+        stop=stop_after_attempt(attempts) | stop_after_delay(budget),
+        wait=wait_random_exponential(multiplier=0.2, max=2),
+        retry=retry_if_exception(is_transient),
+        before_sleep=before_sleep,
+        reraise=True,
+    )
+    try:
+        return retrying(attempt)
+    except BackendUnavailable:
+        record("failures")
+        raise
+    except Exception as exc:
+        if not is_transient(exc):
+            raise
+        record("failures")
+        raise BackendUnavailable(str(exc)) from exc
@@ -1,66 +1,45 @@
 import streamlit as st
-import pandas as pd
-from supabase import create_client
-import os
-from dotenv import load_dotenv
-from datetime import date, timedelta
-
-# Load .env
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-st.markdown(
-    """
-    <style>
-    .stApp { background-color: #0A0F29; color: #FFD700; margin: 0 auto;}
-    section[data-testid="stSidebar"] { background-color: #FFFFFF; color: #000000; }
-    section[data-testid="stSidebar"] * { color: #000000 !important; }
-    .computer-card { border-radius: 10px; padding: 15px; margin: 5px; text-align: center; font-weight: bold; }
-    .available { background-color: #006400; color: #FFFFFF; }
-    .not-available { background-color: #8B0000; color: #FFFFFF; }
-    .computer-card p { color: #FFFFFF !important; }
-    
-    .stButton>button {
-        color: #065F46;
-        background-color: #A3E635;  /* Mengatur warna latar belakang tombol */
-    }
-    
-    </style>
-    """,
-    unsafe_allow_html=True,
+from datetime import date, datetime, time, timedelta
+
+from database.auth import login_guard, verify_user
+from database.connection import backend_guard, backend_notice
+from database.frames import schedule_frame
+from database.queries import (
+    create_loan,
+    get_active_loans,
+    get_computer_loans,
+    get_computer_schedules,
+    get_computers,
+    get_schedules,
+    get_user_loans_overlapping,
+    get_user_prodi,
 )
+from utils.config import BOOKING_WINDOW_DAYS
+from utils.helpers import format_periode
+from utils.intervals import IntervalIndex, booking_interval, loan_interval
+from utils.page import apply_theme, computer_grid_html
+from utils.session_cache import session_availability
+
+apply_theme()
 
 st.title("💻 Monitoring & Pengajuan Peminjaman Komputer")
 st.markdown("Pantau ketersediaan komputer dan ajukan peminjaman berdasarkan hari.")
 
-# Ambil data komputer
-computers = supabase.table("computers").select("*").execute()
-schedules = supabase.table("computer_schedule").select("*").execute()
+today = date.today()
+max_date = today + timedelta(days=BOOKING_WINDOW_DAYS)
+
+backend_notice()
 
-df_computers = pd.DataFrame(computers.data)
-df_schedules = pd.DataFrame(schedules.data)
+# Ambil data komputer & jadwal di jendela booking (cache bersama antar worker)
+with backend_guard():
+    # Jadwal + komputer sebagai frame bertipe (category/date32, lihat database/frames.py)
+    df = schedule_frame(
+        get_computers(), get_schedules(today.isoformat(), max_date.isoformat())
+    )
 
-if df_computers.empty or df_schedules.empty:
+if df.empty:
     st.warning("⚠️ Belum ada data komputer atau jadwal ketersediaan.")
 else:
-    # Pastikan loan_date hanya tanggal (tanpa waktu)
-    df_schedules["loan_date"] = pd.to_datetime(df_schedules["loan_date"]).dt.date
-
-    # Merge jadwal dengan komputer
-    df = df_schedules.merge(df_computers, left_on="computer_id", right_on="id")
-    df = df[["id_y", "name", "location", "loan_date", "available"]].rename(
-        columns={
-            "id_y": "computer_id",
-            "name": "Komputer",
-            "location": "Lokasi",
-            "loan_date": "Tanggal",
-            "available": "Tersedia",
-        }
-    )
 
     # # 🔽 Pilihan lokasi lab
     # all_locations = df["Lokasi"].unique().tolist()
@@ -69,27 +48,54 @@ else:
     # # Filter berdasarkan lokasi (jika bukan "Semua Lab")
     # df = df[df["Lokasi"] == selected_location]
 
-    today = date.today()
-    max_date = today + timedelta(days=7)
-
-    tanggal = st.date_input(
-        "📅 :blue[Pilih tanggal:]", value=today, min_value=today, max_value=max_date
+    periode = st.date_input(
+        "📅 :blue[Pilih tanggal (bisa rentang beberapa hari):]",
+        value=(today, today),
+        min_value=today,
+        max_value=max_date,
+    )
+    if not periode:
+        st.info("ℹ️ Pilih tanggal peminjaman terlebih dahulu.")
+        st.stop()
+    # Saat user baru memilih tanggal awal, date_input mengembalikan 1 tanggal
+    tanggal, tanggal_akhir = periode[0], periode[-1]
+
+    pakai_jam = st.checkbox("⏰ Pinjam per jam (bukan seharian)")
+    jam_mulai = jam_selesai = None
+    if pakai_jam:
+        col_mulai, col_selesai = st.columns(2)
+        jam_mulai = col_mulai.time_input(
+            ":blue[Jam mulai:]", value=time(8, 0), step=timedelta(minutes=30)
+        )
+        jam_selesai = col_selesai.time_input(
+            ":blue[Jam selesai:]", value=time(10, 0), step=timedelta(minutes=30)
+        )
+
+    # Jam hanya untuk booking satu hari (constraint loans_periode_check)
+    slot_mulai, slot_selesai = booking_interval(
+        tanggal, tanggal_akhir, jam_mulai, jam_selesai
+    )
+    durasi = slot_selesai - slot_mulai
+    n_hari = (tanggal_akhir - tanggal).days + 1
+    periode_text = format_periode(
+        {
+            "loan_date": tanggal,
+            "end_date": tanggal_akhir,
+            "start_time": jam_mulai,
+            "end_time": jam_selesai,
+        }
     )
 
     # Filter berdasarkan tanggal yang cocok
     df_tanggal = df[df["Tanggal"] == tanggal].sort_values(by="Komputer")
 
-    st.subheader(f"📋 Daftar Komputer Tanggal {tanggal}")
-
-    # Gunakan tanggal sebagai bagian key untuk session_state
-    session_key = f"status_komputer_{tanggal.isoformat()}"
-    if session_key not in st.session_state:
-        st.session_state[session_key] = {}
+    st.subheader(f"📋 Daftar Komputer {periode_text}")
 
-    # Update isi session_state sesuai df_tanggal
-    for row in df_tanggal.itertuples():
-        if row.computer_id not in st.session_state[session_key]:
-            st.session_state[session_key][row.computer_id] = row.Tersedia
+    # Snapshot ketersediaan per tanggal di sesi (LRU, lihat utils/session_cache.py)
+    status_komputer = session_availability()
+    status_komputer.remember(
+        tanggal, zip(df_tanggal["computer_id"], df_tanggal["Tersedia"])
+    )
 
     # Input NIM & password
     nim_global = st.text_input(":blue[Masukkan NIM Anda (wajib diisi):]")
@@ -97,23 +103,24 @@ else:
     user_id_global = None
     selected_location = None
 
-    if nim_global and password_input:
-        # ✅ Gunakan RPC untuk cek NIM + password
-        check = supabase.rpc(
-            "check_user_password", {"p_nim": nim_global, "p_password": password_input}
-        ).execute()
-
-        if check.data and check.data["valid"]:
-            user_id_global = check.data["id"]
+    if pakai_jam and n_hari > 1:
+        st.error(
+            "❌ Pinjam per jam hanya untuk satu hari. Pilih satu tanggal "
+            "atau pinjam seharian."
+        )
+    elif durasi <= timedelta(0):
+        st.error("❌ Jam selesai harus setelah jam mulai.")
+    elif nim_global and password_input:
+        # ✅ Cek NIM + password lewat gateway login (cache + rate limit)
+        with login_guard():
+            check = verify_user(nim_global, password_input)
+
+        if check and check["valid"]:
+            user_id_global = check["id"]
             # Ambil prodi setelah password valid
-            user_resp = (
-                supabase.table("users")
-                .select("prodi")
-                .eq("id", user_id_global)
-                .execute()
-            )
-            if user_resp.data:
-                user_prodi = user_resp.data[0]["prodi"]
+            with backend_guard():
+                user_prodi = get_user_prodi(user_id_global)
+            if user_prodi:
                 st.success("✅ Login berhasil!")
             else:
                 st.error("❌ Data user tidak ditemukan.")
@@ -136,9 +143,82 @@ else:
                 by="Komputer"
             )
 
-            # 🔹 Tampilkan Statistik TOTAL setelah NIM valid
-            total = len(df_tanggal)
-            tersedia = df_tanggal["Tersedia"].sum()
+            # Jadwal harian harus tersedia di SEMUA hari dalam periode
+            df_periode = df_filtered[
+                (df_filtered["Tanggal"] >= tanggal)
+                & (df_filtered["Tanggal"] <= tanggal_akhir)
+            ]
+            jadwal_periode = df_periode.groupby("computer_id")["Tersedia"].agg(
+                ["all", "count"]
+            )
+            jadwal_ok = set(
+                jadwal_periode[
+                    jadwal_periode["all"] & (jadwal_periode["count"] == n_hari)
+                ].index
+            )
+
+            # 🔹 Ambil semua pinjaman aktif di jendela booking sekali saja,
+            # lalu cek overlap per komputer lewat indeks interval
+            with backend_guard():
+                loans_window = get_active_loans(today.isoformat(), max_date.isoformat())
+            approved_index = IntervalIndex.from_loans(
+                loan for loan in loans_window if loan["status"] == "approved"
+            )
+            pending_index = IntervalIndex.from_loans(
+                loan for loan in loans_window if loan["status"] == "pending"
+            )
+            batas_jendela = datetime.combine(max_date + timedelta(days=1), time.min)
+            # Tanggal yang jadwal hariannya buka, per komputer (untuk "Kosong lagi")
+            # (tanpa groupby: agregat set tidak bisa di-cast balik ke date32)
+            buka = df_filtered["Tersedia"]
+            hari_buka = {}
+            for computer_id, hari in zip(
+                df_filtered.loc[buka, "computer_id"], df_filtered.loc[buka, "Tanggal"]
+            ):
+                hari_buka.setdefault(computer_id, set()).add(hari)
+
+            # Status semua komputer dihitung dulu, lalu grid dirender sebagai
+            # satu blok HTML + satu form (jumlah elemen tidak bergantung ukuran lab)
+            cards = []
+            for row in df_tanggal.itertuples():
+                # Default ke jadwal jika snapshot tanggal sudah dibuang
+                available = (
+                    status_komputer.get(tanggal, row.computer_id, row.Tersedia)
+                    and row.computer_id in jadwal_ok
+                    and not approved_index.overlaps(
+                        row.computer_id, slot_mulai, slot_selesai
+                    )
+                )
+                note = ""
+                if not available:
+                    status = "not-available"
+                    next_free = approved_index.first_free(
+                        row.computer_id,
+                        slot_mulai,
+                        batas_jendela,
+                        durasi,
+                        days=hari_buka.get(row.computer_id, set()),
+                    )
+                    if next_free and next_free != slot_mulai:
+                        note = f"Kosong lagi: {next_free.strftime('%Y-%m-%d %H:%M')}"
+                elif pending_index.overlaps(row.computer_id, slot_mulai, slot_selesai):
+                    status = "pending"
+                else:
+                    status = "available"
+                cards.append(
+                    {
+                        "computer_id": row.computer_id,
+                        "name": row.Komputer,
+                        "location": row.Lokasi,
+                        "status": status,
+                        "note": note,
+                    }
+                )
+
+            # 🔹 Tampilkan Statistik TOTAL setelah NIM valid, dari status kartu
+            # (jadwal semua hari di periode + slot waktu yang sudah disetujui)
+            total = len(cards)
+            tersedia = sum(card["status"] == "available" for card in cards)
             tidak_tersedia = total - tersedia
 
             st.markdown(
@@ -191,135 +271,113 @@ else:
                 unsafe_allow_html=True,
             )
 
-            # 🔹 Tambahkan pengecekan pending di sini
-            loans_pending_resp = (
-                supabase.table("loans")
-                .select("computer_id, status")
-                .eq("loan_date", tanggal.isoformat())
-                .eq("status", "pending")
-                .execute()
-            )
-
-            # Buat list komputer yang sedang diajukan
-            pending_computers = [
-                loan["computer_id"] for loan in loans_pending_resp.data
-            ]
-
-            cards_per_row = 3
-
-            for i in range(0, len(df_tanggal), cards_per_row):
-                with st.container():
-                    row_cards = df_tanggal.iloc[i : i + cards_per_row]
-                    cols = st.columns(len(row_cards))
+            st.markdown(computer_grid_html(cards), unsafe_allow_html=True)
 
-                    for col, row in zip(cols, row_cards.itertuples()):
-                        # Gunakan .get() agar aman jika belum ada key
-                        available = st.session_state[session_key].get(
-                            row.computer_id, row.Tersedia
+            if not any(card["status"] == "available" for card in cards):
+                st.info("ℹ️ Tidak ada komputer yang bisa diajukan untuk periode ini.")
+            else:
+                # Opsi = semua komputer di grid, bukan hanya yang kosong: ID widget
+                # dihitung dari opsi, jadi opsi yang ikut berubah saat user lain
+                # mengajukan akan mereset pilihan. Status kartu ikut di label:
+                # jika status berubah sebelum kirim, pilihan kosong dan user
+                # diminta memilih lagi (bukan terkirim ke komputer lain).
+                # Ketersediaan tetap dicek ulang saat kirim.
+                komputer = {card["computer_id"]: card for card in cards}
+                status_opsi = {
+                    "pending": "sedang diajukan",
+                    "not-available": "tidak tersedia",
+                }
+
+                def label_komputer(cid):
+                    card = komputer[cid]
+                    status = status_opsi.get(card["status"])
+                    return f"{card['name']} ({status})" if status else card["name"]
+
+                with st.form(key="form_pengajuan"):
+                    st.markdown("**Ajukan Peminjaman**")
+                    computer_id = st.selectbox(
+                        "Nomor Komputer:",
+                        options=list(komputer),
+                        format_func=label_komputer,
+                        index=None,
+                        placeholder="Pilih komputer yang tersedia",
+                        key="pengajuan_komputer",
+                    )
+                    st.text_input("Periode:", value=periode_text, disabled=True)
+                    submitted = st.form_submit_button("Kirim Pengajuan")
+
+                if submitted and computer_id is None:
+                    st.warning("⚠️ Pilih nomor komputer terlebih dahulu.")
+                elif submitted:
+                    pilihan = komputer[computer_id]
+                    # 🔎 Ambil prodi user
+                    with backend_guard():
+                        user_prodi = get_user_prodi(user_id_global)
+                    allowed_lab = prodi_to_lab.get(user_prodi, None)
+
+                    if not user_prodi:
+                        st.error("❌ Data prodi user tidak ditemukan, hubungi admin.")
+                    # ✅ Verifikasi prodi vs lokasi komputer
+                    elif allowed_lab and pilihan["location"] != allowed_lab:
+                        st.error(
+                            f"❌ Anda dari prodi {user_prodi}, hanya bisa meminjam di {allowed_lab}"
                         )
-                        status_class = "available" if available else "not-available"
-                        status_text = (
-                            "✅ Available" if available else "❌ Tidak Tersedia"
+                    else:
+                        # Cek apakah user sudah punya pengajuan yang beririsan
+                        with backend_guard():
+                            existing_loan = get_user_loans_overlapping(
+                                user_id_global,
+                                tanggal.isoformat(),
+                                tanggal_akhir.isoformat(),
+                            )
+                        bentrok = any(
+                            mulai < slot_selesai and selesai > slot_mulai
+                            for mulai, selesai in map(loan_interval, existing_loan)
                         )
 
-                        # Tampilkan card (hanya visual)
-                        col.markdown(
-                            f"""
-                            <div class="computer-card {status_class}">
-                                <div style="font-size:40px;">🖥️</div>
-                                <div>{row.Komputer}</div>
-                                <div style="font-size:14px;">{status_text}</div>
-                                <div style="font-size:12px;">{row.Lokasi}</div>
-                            </div>
-                            """,
-                            unsafe_allow_html=True,
+                        # Status grid bisa sudah basi: cek ulang komputer terpilih
+                        # dari database, bukan dari hasil render
+                        with backend_guard():
+                            jadwal = get_computer_schedules(
+                                computer_id,
+                                tanggal.isoformat(),
+                                tanggal_akhir.isoformat(),
+                            )
+                            pinjaman = get_computer_loans(
+                                computer_id,
+                                tanggal.isoformat(),
+                                tanggal_akhir.isoformat(),
+                            )
+                        masih_kosong = (
+                            len(jadwal) == n_hari
+                            and all(row["available"] for row in jadwal)
+                            and not any(
+                                mulai < slot_selesai and selesai > slot_mulai
+                                for mulai, selesai in map(loan_interval, pinjaman)
+                            )
                         )
 
-                        if row.computer_id in pending_computers:
-                            col.button(
-                                "❌ Sedang diajukan user lain",
-                                disabled=True,
-                                key=f"pending_{row.computer_id}_{tanggal.isoformat()}",
+                        if bentrok:
+                            st.warning(
+                                "⚠️ Anda sudah mengajukan peminjaman pada periode ini."
+                            )
+                        elif not masih_kosong:
+                            st.error(
+                                f"❌ {pilihan['name']} sudah tidak tersedia untuk "
+                                "periode ini. Silakan pilih komputer lain."
                             )
-
-                        # Tampilkan tombol / form interaktif **setelah card**
-                        elif available:
-                            with col.expander("Ajukan Peminjaman"):
-                                with st.form(key=f"form_{row.computer_id}"):
-                                    st.text_input(
-                                        "Nomor Komputer:",
-                                        value=row.Komputer,
-                                        disabled=True,
-                                    )
-                                    submitted = st.form_submit_button("Kirim Pengajuan")
-
-                                    if submitted:
-                                        if not user_id_global:
-                                            st.error(
-                                                "❌ Anda belum memasukkan NIM yang valid di atas."
-                                            )
-                                        else:
-                                            # 🔎 Ambil prodi user
-                                            user_resp = (
-                                                supabase.table("users")
-                                                .select("prodi")
-                                                .eq("id", user_id_global)
-                                                .execute()
-                                            )
-                                            if user_resp.data:
-                                                user_prodi = user_resp.data[0]["prodi"]
-
-                                                allowed_lab = prodi_to_lab.get(
-                                                    user_prodi, None
-                                                )
-
-                                                # ✅ Verifikasi prodi vs lokasi komputer
-                                                if (
-                                                    allowed_lab
-                                                    and row.Lokasi != allowed_lab
-                                                ):
-                                                    st.error(
-                                                        f"❌ Anda dari prodi {user_prodi}, hanya bisa meminjam di {allowed_lab}"
-                                                    )
-                                                else:
-                                                    # Cek apakah user sudah punya pengajuan pada tanggal ini
-                                                    existing_loan = (
-                                                        supabase.table("loans")
-                                                        .select("*")
-                                                        .eq("user_id", user_id_global)
-                                                        .eq(
-                                                            "loan_date",
-                                                            tanggal.isoformat(),
-                                                        )
-                                                        .neq("status", "rejected")
-                                                        .execute()
-                                                    )
-
-                                                    if existing_loan.data:
-                                                        st.warning(
-                                                            "⚠️ Anda sudah mengajukan peminjaman pada tanggal ini."
-                                                        )
-                                                    else:
-                                                        supabase.table("loans").insert(
-                                                            {
-                                                                "user_id": user_id_global,
-                                                                "computer_id": row.computer_id,
-                                                                "loan_date": tanggal.isoformat(),
-                                                                "status": "pending",
-                                                            }
-                                                        ).execute()
-                                                        st.success(
-                                                            f"✅ Pengajuan {row.Komputer} berhasil dikirim!"
-                                                        )
-                                            else:
-                                                st.error(
-                                                    "❌ Data prodi user tidak ditemukan, hubungi admin."
-                                                )
                         else:
-                            col.button(
-                                "Tidak tersedia",
-                                disabled=True,
-                                key=f"not_available_{row.computer_id}_{tanggal.isoformat()}",
+                            with backend_guard():
+                                create_loan(
+                                    user_id_global,
+                                    computer_id,
+                                    tanggal,
+                                    tanggal_akhir,
+                                    jam_mulai,
+                                    jam_selesai,
+                                )
+                            st.success(
+                                f"✅ Pengajuan {pilihan['name']} berhasil dikirim!"
                             )
 
         else:
@@ -1,30 +1,14 @@
 import streamlit as st
-import pandas as pd
-from supabase import create_client
-import os
-from dotenv import load_dotenv
 
-# Load environment
-load_dotenv()
-supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+from database.auth import login_guard, verify_user
+from database.connection import backend_guard, backend_notice
+from database.queries import get_user_loan_history
+from utils.page import apply_theme
 
-# CSS
-st.markdown(
-    """
-    <style>
-    .stApp { background-color: #0A0F29; color: #FFD700; margin: 0 auto;}
-    section[data-testid="stSidebar"] { background-color: #FFFFFF; color: #000000; }
-    section[data-testid="stSidebar"] * { color: #000000 !important; }
-    .stButton>button {
-        color: #065F46;
-        background-color: #A3E635;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+apply_theme()
 
 st.subheader("📑 Cek Peminjaman Komputer")
+backend_notice()
 
 nim = st.text_input(":blue[Masukkan NIM:]")
 password = st.text_input(":blue[Password:]", type="password")
@@ -32,46 +16,23 @@ password = st.text_input(":blue[Password:]", type="password")
 if st.button("Lihat Status Peminjaman"):
     if nim and password:
         # Cek user
-        check = supabase.rpc(
-            "check_user_password", {"p_nim": nim, "p_password": password}
-        ).execute()
+        with login_guard():
+            check = verify_user(nim, password)
 
-        if check.data and check.data["valid"]:
-            user_id = check.data["id"]
+        if check and check["valid"]:
+            user_id = check["id"]
             st.success("✅ Login berhasil!")
 
             # Ambil data peminjaman dari loans + users + computers
-            loans = (
-                supabase.table("loans")
-                .select(
-                    "loan_date, status, "
-                    "computer_id, "
-                    "computers(name, location),"
-                    "users(name, nim)"
-                )
-                .eq("user_id", user_id)
-                .order("loan_date", desc=True)
-                .execute()
-            )
+            with backend_guard():
+                loans = get_user_loan_history(user_id)
 
-            if loans.data:
+            if loans:
                 st.subheader("📋 Riwayat Peminjaman Anda")
-                df_loans = pd.DataFrame(loans.data)
+                # pandas/pyarrow baru diimpor di sini agar halaman login cepat dimuat
+                from database.frames import loan_history_frame
 
-                # Flatten nested dicts
-                df_loans["Nama Komputer"] = df_loans["computers"].apply(
-                    lambda x: x["name"]
-                )
-                df_loans["Nama Lab"] = df_loans["computers"].apply(
-                    lambda x: x["location"]
-                )
-                df_loans["Nama User"] = df_loans["users"].apply(lambda x: x["name"])
-                df_loans["NIM"] = df_loans["users"].apply(lambda x: x["nim"])
-
-                # Rename kolom
-                df_loans = df_loans.rename(
-                    columns={"loan_date": "Tanggal", "status": "Status"}
-                )
+                df_loans = loan_history_frame(loans)
 
                 def highlight_status(val):
                     if val == "approved":
@@ -90,6 +51,7 @@ if st.button("Lihat Status Peminjaman"):
                         "Nama Lab",
                         "Nama Komputer",
                         "Tanggal",
+                        "Periode",
                     ]
                 ].style.applymap(highlight_status, subset=["Status"])
                 st.dataframe(styled_df, use_container_width=True)
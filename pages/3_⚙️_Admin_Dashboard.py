@@ -1,36 +1,28 @@
 import streamlit as st
-import pandas as pd
-from supabase import create_client
-import os
-from dotenv import load_dotenv
-from datetime import date, timedelta, datetime
-
-# Load environment
-load_dotenv()
-supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
-
-# --- CSS Styling ---
-st.markdown(
-    """
-    <style>
-    .stApp { background-color: #0A0F29; color: #FFD700; margin: 0 auto;}
-    section[data-testid="stSidebar"] { background-color: #FFFFFF; color: #000000; }
-    section[data-testid="stSidebar"] * { color: #000000 !important; }
-    .computer-card { border-radius: 10px; padding: 15px; margin: 5px; text-align: center; font-weight: bold; }
-    .available { background-color: #006400; color: #FFFFFF; }
-    .not-available { background-color: #8B0000; color: #FFFFFF; }
-    .computer-card p { color: #FFFFFF !important; }
-    .stButton>button {
-        color: #065F46;
-        background-color: #A3E635;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
+from datetime import date, timedelta
+
+from database.approval import run_auto_approval
+from database.auth import get_auth_metrics, login_guard, verify_admin
+from database.connection import backend_guard, backend_notice, get_client
+from database.queries import (
+    SlotTaken,
+    approve_loan,
+    get_computers,
+    reject_loan,
+    search_loans,
 )
+from database.resilience import get_metrics
+from utils.config import ADMIN_PAGE_SIZE, BOOKING_WINDOW_DAYS
+from utils.helpers import format_periode
+from utils.intervals import daterange
+from utils.page import apply_theme
+from utils.session_cache import sessions_report
+
+apply_theme()
 
 st.title("⚙️ Admin Dashboard")
 st.subheader("🔑 Login Admin")
+backend_notice()
 
 # --- SESSION STATE LOGIN ---
 if "logged_in" not in st.session_state:
@@ -44,13 +36,12 @@ if not st.session_state.logged_in:
 
     if st.button("Login"):
         if name and password:
-            check = supabase.rpc(
-                "check_admin_password", {"p_name": name, "p_password": password}
-            ).execute()
+            with login_guard():
+                check = verify_admin(name, password)
 
-            if check.data and check.data["valid"]:
+            if check and check["valid"]:
                 st.session_state.logged_in = True
-                st.session_state.admin_name = check.data["name"]
+                st.session_state.admin_name = check["name"]
             else:
                 st.error("❌ Password salah.")
         else:
@@ -60,49 +51,163 @@ if not st.session_state.logged_in:
 else:
     st.success(f"✅ Login sebagai {st.session_state.admin_name}")
 
-    # --- Pilihan tanggal ---
+    # --- Pilihan periode (auto-approval & pencarian) ---
     today = date.today()
-    next_7_days = [today + timedelta(days=i) for i in range(7)]
-    next_7_days_str = [d.isoformat() for d in next_7_days]
-
-    options = ["Pilih tanggal"] + next_7_days_str + ["Semua 7 hari ke depan"]
-
-    # Set default value ke "Semua 7 hari ke depan"
-    default_option = "Semua 7 hari ke depan"
-    selected_option = st.selectbox(
-        ":blue[Pilih tanggal:]", options, index=options.index(default_option)
+    # Default: N hari ke depan; dikosongkan = semua tanggal di pencarian
+    periode = st.date_input(
+        ":blue[Periode:]",
+        value=(today, today + timedelta(days=BOOKING_WINDOW_DAYS - 1)),
     )
-
-    # Tentukan tanggal yang akan digunakan di query
-    if selected_option == "Semua 7 hari ke depan":
-        selected_dates = next_7_days_str
-    elif selected_option in next_7_days_str:
-        selected_dates = [selected_option]
+    # Saat baru memilih tanggal awal, date_input mengembalikan 1 tanggal
+    if periode:
+        selected_dates = [d.isoformat() for d in daterange(periode[0], periode[-1])]
     else:
         selected_dates = []
 
-    # --- Ambil data loans ---
-    loans = None  # inisialisasi agar selalu ada
+    # --- Status backend (retry, timeout, circuit breaker) ---
+    with st.expander("📈 Status backend"):
+        metrics = get_metrics()
+        col_state, col_calls, col_retries, col_failures = st.columns(4)
+        col_state.metric("Circuit breaker", metrics["breaker_state"])
+        col_calls.metric("Panggilan", metrics["calls"])
+        col_retries.metric("Retry", metrics["retries"])
+        col_failures.metric("Gagal", metrics["failures"])
+        st.caption(
+            f"Timeout: {metrics['timeouts']} · Antrian penuh: "
+            f"{metrics['queue_timeouts']} · Ditolak breaker: "
+            f"{metrics['rejected_open']} · Data cache lama disajikan: "
+            f"{metrics['stale_served']}"
+        )
+
+    # --- Beban login (gateway di depan RPC cek password) ---
+    with st.expander("🔐 Beban login"):
+        auth = get_auth_metrics()
+        col_attempts, col_hits, col_rpc, col_throttled = st.columns(4)
+        col_attempts.metric("Percobaan", auth["attempts"])
+        col_hits.metric("Dari cache", auth["cache_hits"])
+        col_rpc.metric("RPC password", auth["rpc_calls"])
+        col_throttled.metric("Dibatasi", auth["throttled"] + auth["locked"])
+        st.caption(
+            f"Password salah: {auth['failures']} · Ditolak rate limit: "
+            f"{auth['throttled']} · Ditolak backoff: {auth['locked']}"
+        )
+
+    # --- Memori state per sesi (snapshot ketersediaan di Pengajuan) ---
+    with st.expander("🧠 Memori sesi"):
+        sessions = sessions_report()
+        col_sessions, col_total, col_max = st.columns(3)
+        col_sessions.metric("Sesi aktif", sessions["sessions"])
+        col_total.metric("Total", f"{sessions['bytes'] / 1024:.1f} KiB")
+        col_max.metric("Sesi terbesar", f"{sessions['max_bytes'] / 1024:.1f} KiB")
+        st.caption(
+            f"Tanggal tersimpan: {sessions['dates']} · Dibuang (LRU): "
+            f"{sessions['evictions']}"
+        )
+
+    # --- Auto-approval berbasis aturan ---
     if selected_dates:
-        loans = (
-            supabase.table("loans")
-            .select(
-                "id, loan_date, status, user_id, computer_id, "
-                "computers(name, location), users(name, nim)"
+        with st.expander("🤖 Auto-approval pengajuan pending"):
+            st.caption(
+                "Setujui otomatis pengajuan yang komputernya kosong, user-nya tidak "
+                "punya pinjaman lain, dan kuota lab belum penuh."
             )
-            .in_("loan_date", selected_dates)
-            .order("loan_date", desc=False)
-            .execute()
+            col_preview, col_apply = st.columns(2)
+            preview = col_preview.button("🔍 Pratinjau (dry-run)")
+            apply = col_apply.button("✅ Setujui otomatis")
+
+            if preview or apply:
+                try:
+                    with backend_guard():
+                        report, approved_ids = run_auto_approval(
+                            get_client(), dates=selected_dates, dry_run=not apply
+                        )
+                except SlotTaken as exc:
+                    st.warning(f"⚠️ {exc}. Tidak ada yang disetujui, coba lagi.")
+                else:
+                    if report:
+                        import pandas as pd
+
+                        df_report = pd.DataFrame(report)
+                        df_report["reasons"] = df_report["reasons"].apply("; ".join)
+                        st.dataframe(
+                            df_report.rename(
+                                columns={
+                                    "loan_id": "ID",
+                                    "loan_date": "Tanggal",
+                                    "periode": "Periode",
+                                    "computer": "Komputer",
+                                    "location": "Lab",
+                                    "nim": "NIM",
+                                    "name": "Nama",
+                                    "approve": "Lolos",
+                                    "reasons": "Alasan",
+                                }
+                            ),
+                            use_container_width=True,
+                        )
+                    else:
+                        st.info("Tidak ada pengajuan pending.")
+
+                    if apply:
+                        st.success(f"{len(approved_ids)} pengajuan disetujui otomatis.")
+
+    # --- Cari pinjaman (filter & paginasi di server) ---
+    st.subheader("🔎 Cari Peminjaman")
+    with backend_guard():
+        labs = sorted({c["location"] for c in get_computers()})
+
+    with st.form("cari_pinjaman"):
+        col_nim, col_nama, col_komputer = st.columns(3)
+        cari_nim = col_nim.text_input(":blue[NIM:]")
+        cari_nama = col_nama.text_input(":blue[Nama:]")
+        cari_komputer = col_komputer.text_input(":blue[Komputer:]")
+        col_lab, col_status = st.columns(2)
+        cari_lab = col_lab.selectbox(":blue[Lab:]", ["Semua lab"] + labs)
+        # Default pending: tugas utama admin, tetap diurutkan di server
+        cari_status = col_status.multiselect(
+            ":blue[Status:]",
+            ["pending", "approved", "rejected", "returned"],
+            default=["pending"],
         )
+        st.form_submit_button("Cari")
+
+    filters = {
+        "nim": cari_nim,
+        "name": cari_nama,
+        "computer": cari_komputer,
+        "lab": None if cari_lab == "Semua lab" else cari_lab,
+        "statuses": cari_status,
+        # Periode di atas; termasuk pinjaman multi-hari yang dimulai sebelumnya
+        "first": selected_dates[0] if selected_dates else None,
+        "last": selected_dates[-1] if selected_dates else None,
+    }
+    # Filter berubah -> kembali ke halaman pertama
+    if st.session_state.get("search_filters") != filters:
+        st.session_state.search_filters = filters
+        st.session_state.search_page = 0
+    page = st.session_state.search_page
+
+    with backend_guard():
+        result = search_loans(**filters, page=page)
+    loans, total = result["rows"], result["total"]
+    n_pages = max(1, -(-total // ADMIN_PAGE_SIZE))
+    # Hasil berkurang (mis. baris terakhir di halaman terakhir di-ACC dengan
+    # filter pending): pindah ke halaman terakhir yang masih ada
+    if page >= n_pages:
+        page = st.session_state.search_page = n_pages - 1
+        with backend_guard():
+            result = search_loans(**filters, page=page)
+        loans, total = result["rows"], result["total"]
 
     # --- Tampilkan data loans ---
-    if loans and loans.data:
-        # Tambahkan sorting: pending dulu
-        sorted_loans = sorted(
-            loans.data, key=lambda x: 0 if x["status"].lower() == "pending" else 1
+    if loans:
+        st.caption(
+            f"Menampilkan {page * ADMIN_PAGE_SIZE + 1}–"
+            f"{page * ADMIN_PAGE_SIZE + len(loans)} dari {total} pinjaman"
         )
-
-        for loan in sorted_loans:
+        # Urutan dari server (tanggal, id) agar konsisten antar halaman;
+        # pending saja bisa dipilih lewat filter Status
+        for loan in loans:
             status = loan["status"].lower()
             if status == "pending":
                 status_color = "#FFD700"
@@ -122,7 +227,7 @@ else:
                     background-color: #1E1E2F; 
                     color: white;
                 ">
-                    📅 {loan['loan_date']} | 💻 {loan['computers']['name']} | 🏫 {loan['computers']['location']} 
+                    📅 {format_periode(loan)} | 💻 {loan['computers']['name']} | 🏫 {loan['computers']['location']} 
                     | 👤 {loan['users']['name']} ({loan['users']['nim']}) 
                     | <span style='color:{status_color}; font-weight:bold'>Status: {loan['status']}</span>
                 </div>
@@ -134,37 +239,40 @@ else:
 
             with col1:
                 if st.button("✅ ACC", key=f"acc_{loan['id']}"):
-                    # --- Update status loan ---
-                    supabase.table("loans").update({"status": "approved"}).eq(
-                        "id", loan["id"]
-                    ).execute()
-                    st.success(f"Peminjaman {loan['computers']['name']} disetujui!")
-
-                    # --- Update computer_schedule: available = False + simpan user_id ---
-                    loan_date_clean = None
-                    if loan.get("loan_date"):
-                        try:
-                            loan_date_clean = (
-                                datetime.fromisoformat(str(loan["loan_date"]))
-                                .date()
-                                .isoformat()
+                    # --- Update status loan + computer_schedule ---
+                    try:
+                        with backend_guard():
+                            approved = approve_loan(loan)
+                    except SlotTaken:
+                        st.warning(
+                            f"⚠️ {loan['computers']['name']} sudah disetujui untuk "
+                            "peminjaman lain di periode ini. Tolak pengajuan ini."
+                        )
+                    else:
+                        komputer = loan["computers"]["name"]
+                        if approved:
+                            st.success(f"Peminjaman {komputer} disetujui!")
+                        else:
+                            st.info(
+                                f"ℹ️ Peminjaman {komputer} sudah tidak pending "
+                                "(diproses admin lain)."
                             )
-                        except Exception:
-                            loan_date_clean = str(loan["loan_date"])
-
-                    supabase.table("computer_schedule").update(
-                        {"available": False, "user_id": loan["user_id"]}
-                    ).eq("computer_id", loan["computer_id"]).eq(
-                        "loan_date", loan_date_clean
-                    ).execute()
-
-                    st.session_state["last_action"] = loan["id"]
+                        st.session_state["last_action"] = loan["id"]
 
             with col2:
                 if st.button("❌ Tolak", key=f"reject_{loan['id']}"):
-                    supabase.table("loans").update({"status": "rejected"}).eq(
-                        "id", loan["id"]
-                    ).execute()
+                    with backend_guard():
+                        reject_loan(loan["id"])
                     st.warning(f"Peminjaman {loan['computers']['name']} ditolak.")
+
+        # --- Paginasi ---
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        if col_prev.button("⬅️ Sebelumnya", disabled=page == 0):
+            st.session_state.search_page -= 1
+            st.rerun()
+        col_page.caption(f"Halaman {page + 1} dari {n_pages}")
+        if col_next.button("Berikutnya ➡️", disabled=page + 1 >= n_pages):
+            st.session_state.search_page += 1
+            st.rerun()
     else:
-        st.info("⚠️ Harap pilih tanggal atau tidak ada data peminjaman.")
+        st.info("⚠️ Tidak ada peminjaman yang cocok dengan pencarian.")
@@ -0,0 +1,62 @@
+"""Cache disk yang penuh/tidak bisa ditulis tidak boleh menjatuhkan data layer."""
+
+import errno
+from datetime import date
+
+import pytest
+
+from database import cache, queries
+from database.cache import CacheUnavailable, DiskCache, set_cache
+from database.connection import set_client
+from tools.fakedb import FakeSupabase, seed
+
+
+@pytest.fixture
+def full_disk(tmp_path, monkeypatch):
+    fake = seed(FakeSupabase(), per_lab=2, users=3, days=2)
+    set_client(fake)
+    set_cache(DiskCache(str(tmp_path / "cache")))
+
+    def no_space(*args, **kwargs):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(cache.tempfile, "mkstemp", no_space)
+    monkeypatch.setattr(cache.os, "mkdir", no_space)
+    yield fake
+    set_client(None)
+    set_cache(None)
+
+
+def test_disk_errors_raise_cache_unavailable(full_disk):
+    with pytest.raises(CacheUnavailable):
+        cache.get_cache().set("key", 1)
+    with pytest.raises(CacheUnavailable):
+        cache.get_cache().incr("counter")
+
+
+def test_cached_read_falls_back_to_database(full_disk):
+    assert len(queries.get_computers()) == len(full_disk.tables["computers"])
+
+
+def test_write_survives_failed_invalidation(full_disk):
+    today = date.today()
+    queries.create_loan(1, 1, today, today)
+    assert len(full_disk.tables["loans"]) == 1
+
+    loan = full_disk.tables["loans"][0]
+    queries.approve_loan(loan)
+    assert loan["status"] == "approved"
+
+    # SlotTaken tidak tertutup error dari invalidasi di finally
+    other = full_disk.add(
+        "loans",
+        user_id=2,
+        computer_id=1,
+        loan_date=today.isoformat(),
+        end_date=today.isoformat(),
+        start_time=None,
+        end_time=None,
+        status="pending",
+    )
+    with pytest.raises(queries.SlotTaken):
+        queries.approve_loan(other)
@@ -0,0 +1,89 @@
+"""Smoke test halaman Pengajuan dengan AppTest di atas ``tools/fakedb``."""
+
+from datetime import date
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from database.cache import MemoryCache, set_cache
+from database.connection import set_client
+from tools.fakedb import FakeSupabase, seed
+
+PAGE = "pages/1_📅_Pengajuan.py"
+
+
+@pytest.fixture
+def db():
+    fake = seed(FakeSupabase(), per_lab=3, users=6)
+    set_client(fake)
+    set_cache(MemoryCache())
+    yield fake
+    set_client(None)
+    set_cache(None)
+
+
+def login(nim):
+    at = AppTest.from_file(PAGE, default_timeout=30).run()
+    at.text_input[0].input(nim)
+    at.text_input[1].input("pw")
+    return at.run()
+
+
+def grid_html(at):
+    return next(
+        md.value for md in at.markdown if '<div class="computer-grid">' in md.value
+    )
+
+
+def stat_numbers(at):
+    stats = next(md.value for md in at.markdown if "stats-container" in md.value)
+    return [
+        int(part.split("</div>")[0].split(">")[-1])
+        for part in stats.split('class="stat-number"')[1:]
+    ]
+
+
+def test_login_renders_grid_and_stats(db):
+    at = login("230000")
+
+    assert not at.exception
+    assert grid_html(at).count('class="computer-card') == 3
+    assert stat_numbers(at) == [3, 3, 0]
+
+
+def first_computer(db, location="Lab Komputer Sains Data"):
+    # User 230000 & 230003 -> prodi Sains Data Terapan -> lab ini
+    return next(c["id"] for c in db.tables["computers"] if c["location"] == location)
+
+
+def test_closed_schedule_has_no_hint_and_stats_follow_cards(db):
+    closed = first_computer(db)
+    for row in db.tables["computer_schedule"]:
+        if row["computer_id"] == closed:
+            row["available"] = False
+
+    at = login("230000")
+
+    assert not at.exception
+    assert "Kosong lagi" not in grid_html(at)
+    assert grid_html(at).count("not-available") == 1
+    assert stat_numbers(at) == [3, 2, 1]
+
+
+def test_submit_then_second_user_sees_pending(db):
+    at = login("230000")
+    # Nilai selectbox = computer_id; label berisi nama + status
+    at.selectbox(key="pengajuan_komputer").set_value(first_computer(db))
+    at.button[0].click().run()
+
+    assert not at.exception
+    loans = db.tables["loans"]
+    assert len(loans) == 1
+    assert loans[0]["status"] == "pending"
+    assert loans[0]["loan_date"] == date.today().isoformat()
+
+    # User lain di prodi yang sama (230003) melihat kartu itu sedang diajukan
+    other = login("230003")
+    assert not other.exception
+    assert grid_html(other).count('class="computer-card pending"') == 1
+    assert "sedang diajukan" in other.selectbox(key="pengajuan_komputer").options[0]
@@ -0,0 +1,453 @@
+"""Backend tiruan in-memory untuk load test dan percobaan lokal.
+
+Meniru subset API client supabase-py yang dipakai data layer: query builder
+PostgREST (``select`` dengan embed ``tabel(kolom)``, filter, ``or_``,
+``order``, ``range``/``limit`` + ``count``, insert/update/delete) dan RPC
+``check_user_password``, ``check_admin_password``, ``approve_loans_batch``.
+
+Constraint dari migrasi ikut ditiru: dua pinjaman ``approved`` untuk komputer
+yang sama dengan periode beririsan ditolak dengan ``APIError`` 23P01
+(``loans_no_double_booking``). ``enforce_exclusion=False`` meniru database
+tanpa migrasi 0004.
+
+Semua operasi diserialisasi dengan satu lock, seperti satu baris yang
+dikunci di Postgres. ``latency`` (detik) ditambahkan ke setiap panggilan
+untuk meniru round trip jaringan. ``calls_by`` menghitung panggilan per nama
+thread yang membuat query (bukan thread pool ``execute``), mis. untuk
+memisahkan panggilan user dan admin di load test.
+
+    from database.connection import set_client
+    from tools.fakedb import FakeSupabase, seed
+
+    set_client(seed(FakeSupabase(latency=0.02)))
+"""
+
+import copy
+import itertools
+from collections import Counter
+import re
+import threading
+import time
+from datetime import date, timedelta
+
+from postgrest.exceptions import APIError
+
+from utils.intervals import loan_interval
+
+LABS = [
+    "Lab Komputer Sains Data",
+    "Lab Komputer Rekayasa Keamanan Siber",
+    "Lab AI & Robotik",
+]
+PRODIS = ["Sains Data Terapan", "Rekayasa Keamanan Siber", "AI dan Robotik"]
+
+TABLES = ["computers", "computer_schedule", "users", "admins", "loans"]
+
+
+class Response:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
+
+
+def _match(op, actual, expected):
+    """Operator filter PostgREST; nilai dibandingkan sebagai teks ISO."""
+    if op == "is":
+        if str(expected) == "null":
+            return actual is None
+        return actual is (str(expected).lower() == "true")
+    if op == "in":
+        return _text(actual) in {_text(v) for v in expected}
+    if op == "eq":
+        return _text(actual) == _text(expected)
+    if op == "neq":
+        return _text(actual) != _text(expected)
+    if op == "ilike":
+        pattern = ".*".join(re.escape(part) for part in str(expected).split("%"))
+        return actual is not None and re.fullmatch(pattern, str(actual), re.I)
+    if actual is None:
+        return False
+    if op == "gt":
+        return _text(actual) > _text(expected)
+    if op == "gte":
+        return _text(actual) >= _text(expected)
+    if op == "lt":
+        return _text(actual) < _text(expected)
+    if op == "lte":
+        return _text(actual) <= _text(expected)
+    raise ValueError(f"Operator tidak didukung: {op}")
+
+
+def _get(row, column):
+    value = row
+    for key in column.split("."):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def _split_top(text):
+    """Pisah dengan koma di luar tanda kurung."""
+    parts, depth, current = [], 0, ""
+    for ch in text:
+        depth += {"(": 1, ")": -1}.get(ch, 0)
+        if ch == "," and depth == 0:
+            parts.append(current)
+            current = ""
+        else:
+            current += ch
+    parts.append(current)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _logic(expr):
+    """``a.gte.1,and(b.is.null,c.eq.2)`` -> list predikat(row)."""
+    predicates = []
+    for part in _split_top(expr):
+        group = re.fullmatch(r"(and|or)\((.*)\)", part)
+        if group:
+            inner = _logic(group.group(2))
+            combine = all if group.group(1) == "and" else any
+            predicates.append(
+                lambda row, inner=inner, combine=combine: combine(p(row) for p in inner)
+            )
+        else:
+            column, op, value = part.split(".", 2)
+            predicates.append(
+                lambda row, c=column, o=op, v=value: _match(o, _get(row, c), v)
+            )
+    return predicates
+
+
+class Query:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.origin = threading.current_thread().name
+        self.columns = "*"
+        self.count = None
+        self.filters = []
+        self.orders = []
+        self.bounds = None
+        self.action = "select"
+        self.payload = None
+
+    def select(self, columns="*", count=None):
+        self.columns, self.count = columns, count
+        return self
+
+    def insert(self, payload):
+        self.action, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict=None):
+        return self.insert(payload)
+
+    def update(self, payload):
+        self.action, self.payload = "update", payload
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def _filter(self, op, column, value):
+        self.filters.append(lambda row: _match(op, _get(row, column), value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter("eq", column, value)
+
+    def neq(self, column, value):
+        return self._filter("neq", column, value)
+
+    def gt(self, column, value):
+        return self._filter("gt", column, value)
+
+    def gte(self, column, value):
+        return self._filter("gte", column, value)
+
+    def lt(self, column, value):
+        return self._filter("lt", column, value)
+
+    def lte(self, column, value):
+        return self._filter("lte", column, value)
+
+    def in_(self, column, values):
+        return self._filter("in", column, list(values))
+
+    def ilike(self, column, pattern):
+        return self._filter("ilike", column, pattern)
+
+    def is_(self, column, value):
+        return self._filter("is", column, value)
+
+    def or_(self, expr, reference_table=None):
+        if reference_table:
+            expr = ",".join(f"{reference_table}.{p}" for p in _split_top(expr))
+        predicates = _logic(expr)
+        self.filters.append(lambda row: any(p(row) for p in predicates))
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def limit(self, size):
+        self.bounds = (0, size - 1)
+        return self
+
+    def execute(self):
+        return self.db._execute(self)
+
+
+class _Rpc:
+    def __init__(self, db, name, params):
+        self.db, self.name, self.params = db, name, params
+        self.origin = threading.current_thread().name
+
+    def execute(self):
+        return self.db._call_rpc(self.name, self.params, self.origin)
+
+
+class FakeSupabase:
+    """Client tiruan dengan tabel sebagai list of dict."""
+
+    def __init__(self, latency=0.0, enforce_exclusion=True):
+        self.latency = latency
+        self.enforce_exclusion = enforce_exclusion
+        self.tables = {name: [] for name in TABLES}
+        self.calls = 0
+        self.calls_by = Counter()
+        self._ids = {name: itertools.count(1) for name in TABLES}
+        self._lock = threading.Lock()
+
+    def add(self, table, **row):
+        """Tambah baris seed tanpa menghitung panggilan."""
+        row.setdefault("id", next(self._ids[table]))
+        self.tables[table].append(row)
+        return row
+
+    def table(self, name):
+        return Query(self, name)
+
+    from_ = table
+
+    def rpc(self, name, params):
+        return _Rpc(self, name, params)
+
+    # --- Eksekusi ---
+
+    def _embed(self, row, columns):
+        """Baris dengan kolom terpilih; ``tabel(kolom)`` diikuti lewat ``tabel_id``."""
+        out = {}
+        for part in _split_top(columns):
+            embed = re.fullmatch(r"(\w+)(?:!inner)?\((.*)\)", part)
+            if embed:
+                table, cols = embed.groups()
+                fk = row.get(table.rstrip("s") + "_id")
+                target = next((r for r in self.tables[table] if r["id"] == fk), None)
+                out[table] = None if target is None else self._embed(target, cols)
+            elif part == "*":
+                out.update(row)
+            else:
+                out[part] = row.get(part)
+        return out
+
+    def _conflicts(self, loan):
+        """Pinjaman approved lain yang periodenya beririsan dengan ``loan``."""
+        start, end = loan_interval(loan)
+        for other in self.tables["loans"]:
+            if (
+                other["id"] != loan["id"]
+                and other["status"] == "approved"
+                and other["computer_id"] == loan["computer_id"]
+            ):
+                other_start, other_end = loan_interval(other)
+                if other_start < end and other_end > start:
+                    return True
+        return False
+
+    def _exclusion_error(self):
+        return APIError(
+            {
+                "message": 'conflicting key value violates exclusion constraint "loans_no_double_booking"',
+                "code": "23P01",
+                "hint": None,
+                "details": None,
+            }
+        )
+
+    def _check_exclusion(self, loan):
+        if (
+            self.enforce_exclusion
+            and loan.get("status") == "approved"
+            and self._conflicts(loan)
+        ):
+            raise self._exclusion_error()
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _execute(self, query):
+        self._wait()
+        with self._lock:
+            self.calls += 1
+            self.calls_by[query.origin] += 1
+            rows = self.tables[query.table]
+
+            if query.action == "insert":
+                payload = query.payload
+                payload = payload if isinstance(payload, list) else [payload]
+                inserted = []
+                for item in payload:
+                    row = dict(item)
+                    row.setdefault("id", next(self._ids[query.table]))
+                    if query.table == "loans":
+                        self._check_exclusion(row)
+                    rows.append(row)
+                    inserted.append(copy.deepcopy(row))
+                return Response(inserted)
+
+            matched = [r for r in rows if all(f(r) for f in query.filters)]
+            if query.action == "update":
+                for row in matched:
+                    if query.table == "loans":
+                        self._check_exclusion({**row, **query.payload})
+                for row in matched:
+                    row.update(query.payload)
+                return Response(copy.deepcopy(matched))
+            if query.action == "delete":
+                for row in matched:
+                    rows.remove(row)
+                return Response(copy.deepcopy(matched))
+
+            # Filter boleh mengacu kolom embed (mis. ``users.nim``)
+            selected = []
+            for row in rows:
+                full = self._embed(row, f"{query.columns},*")
+                if all(f(full) for f in query.filters):
+                    selected.append(self._embed(row, query.columns))
+            for column, desc in reversed(query.orders):
+                selected.sort(key=lambda r: _text(_get(r, column)), reverse=desc)
+            count = len(selected) if query.count else None
+            if query.bounds:
+                selected = selected[query.bounds[0] : query.bounds[1] + 1]
+            return Response(copy.deepcopy(selected), count)
+
+    def _call_rpc(self, name, params, origin=None):
+        self._wait()
+        with self._lock:
+            self.calls += 1
+            self.calls_by[origin] += 1
+            if name == "check_user_password":
+                user = self._find("users", nim=params["p_nim"])
+                valid = bool(user and user["password"] == params["p_password"])
+                return Response({"valid": valid, "id": user["id"] if valid else None})
+            if name == "check_admin_password":
+                admin = self._find("admins", name=params["p_name"])
+                valid = bool(admin and admin["password"] == params["p_password"])
+                return Response(
+                    {"valid": valid, "name": admin["name"] if valid else None}
+                )
+            if name == "approve_loans_batch":
+                return Response(self._approve_batch(params["p_loan_ids"]))
+            raise ValueError(f"RPC tidak dikenal: {name}")
+
+    def _find(self, table, **where):
+        return next(
+            (
+                row
+                for row in self.tables[table]
+                if all(row.get(k) == v for k, v in where.items())
+            ),
+            None,
+        )
+
+    def _approve_batch(self, loan_ids):
+        """Sama seperti migrasi 0003 (satu statement UPDATE).
+
+        Pinjaman yang slotnya sudah diambil sebelum statement dilewati. Dua
+        pinjaman di batch yang saling beririsan tidak saling melihat, jadi
+        keduanya lolos cek lalu melanggar exclusion constraint dan seluruh
+        batch dibatalkan.
+        """
+        batch = [
+            loan
+            for loan in self.tables["loans"]
+            if loan["id"] in loan_ids
+            and loan["status"] == "pending"
+            and not self._conflicts(loan)
+        ]
+        if self.enforce_exclusion:
+            for i, loan in enumerate(batch):
+                start, end = loan_interval(loan)
+                for other in batch[i + 1 :]:
+                    other_start, other_end = loan_interval(other)
+                    if (
+                        other["computer_id"] == loan["computer_id"]
+                        and other_start < end
+                        and other_end > start
+                    ):
+                        raise self._exclusion_error()
+        approved = []
+        for loan in batch:
+            loan["status"] = "approved"
+            approved.append(loan["id"])
+            if loan.get("start_time"):
+                continue
+            start = str(loan["loan_date"])[:10]
+            end = str(loan.get("end_date") or loan["loan_date"])[:10]
+            for schedule in self.tables["computer_schedule"]:
+                if (
+                    schedule["computer_id"] == loan["computer_id"]
+                    and start <= schedule["loan_date"] <= end
+                ):
+                    schedule["available"] = False
+                    schedule["user_id"] = loan["user_id"]
+        return approved
+
+
+def seed(db, per_lab=20, users=300, days=8, labs=None):
+    """Isi komputer, jadwal ``days`` hari ke depan, user, dan satu admin.
+
+    User ke-i memakai NIM ``23000{i}`` dan password ``pw``; admin ``admin``
+    dengan password ``admin``.
+    """
+    labs = labs or LABS
+    today = date.today()
+    for lab in labs:
+        for i in range(per_lab):
+            computer = db.add(
+                "computers", name=f"PC-{lab.split()[-1][:3]}-{i + 1:02d}", location=lab
+            )
+            for offset in range(days):
+                db.add(
+                    "computer_schedule",
+                    computer_id=computer["id"],
+                    loan_date=(today + timedelta(days=offset)).isoformat(),
+                    available=True,
+                    user_id=None,
+                )
+    for i in range(users):
+        db.add(
+            "users",
+            nim=f"23000{i}",
+            name=f"Mahasiswa {i}",
+            prodi=PRODIS[i % len(PRODIS)],
+            password="pw",
+        )
+    db.add("admins", name="admin", password="admin")
+    return db
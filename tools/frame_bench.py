@@ -0,0 +1,169 @@
+"""Benchmark frame bertipe (``database/frames.py``) vs frame object lama.
+
+Data sintetis berbentuk respons PostgREST; dibandingkan ukuran memori
+(``memory_usage(deep=True)``), waktu build, dan waktu filter yang dipakai
+halaman Pengajuan dan Daftar Peminjaman.
+
+    python -m tools.frame_bench
+    python -m tools.frame_bench --computers 300 --days 30 --loans 20000
+"""
+
+import argparse
+import random
+import timeit
+from datetime import date, timedelta
+
+import pandas as pd
+
+from database.frames import loan_history_frame, schedule_frame
+from utils.helpers import format_periode
+
+LABS = [
+    "Lab Komputer Sains Data",
+    "Lab Komputer Rekayasa Keamanan Siber",
+    "Lab AI & Robotik",
+]
+STATUSES = ["pending", "approved", "rejected", "returned"]
+# Kolom yang ditampilkan Daftar Peminjaman; kedua versi dibandingkan di sini
+LOAN_COLUMNS = [
+    "Status",
+    "NIM",
+    "Nama User",
+    "Nama Lab",
+    "Nama Komputer",
+    "Tanggal",
+    "Periode",
+]
+
+
+def synthetic(computers, days, loans, seed=0):
+    rng = random.Random(seed)
+    start = date.today()
+    computer_rows = [
+        {"id": i, "name": f"PC-{i:03d}", "location": LABS[i % len(LABS)]}
+        for i in range(1, computers + 1)
+    ]
+    schedule_rows = [
+        {
+            "id": len(computer_rows) * d + c["id"],
+            "computer_id": c["id"],
+            "loan_date": (start + timedelta(days=d)).isoformat(),
+            "available": rng.random() < 0.8,
+            "user_id": None,
+        }
+        for d in range(days)
+        for c in computer_rows
+    ]
+    loan_rows = []
+    for _ in range(loans):
+        computer = rng.choice(computer_rows)
+        user = rng.randrange(1000)
+        loan_date = start + timedelta(days=rng.randrange(days))
+        loan_rows.append(
+            {
+                "loan_date": loan_date.isoformat(),
+                "end_date": loan_date.isoformat(),
+                "start_time": None,
+                "end_time": None,
+                "status": rng.choice(STATUSES),
+                "computer_id": computer["id"],
+                "computers": {
+                    "name": computer["name"],
+                    "location": computer["location"],
+                },
+                "users": {"name": f"Mahasiswa {user}", "nim": f"{2300000 + user}"},
+            }
+        )
+    return computer_rows, schedule_rows, loan_rows
+
+
+# --- Versi lama (object dtype), disalin dari halaman sebelum frames.py ---
+
+
+def legacy_schedule_frame(computers, schedules):
+    df_schedules = pd.DataFrame(schedules)
+    df_schedules["loan_date"] = pd.to_datetime(df_schedules["loan_date"]).dt.date
+    df = df_schedules.merge(
+        pd.DataFrame(computers), left_on="computer_id", right_on="id"
+    )
+    return df[["id_y", "name", "location", "loan_date", "available"]].rename(
+        columns={
+            "id_y": "computer_id",
+            "name": "Komputer",
+            "location": "Lokasi",
+            "loan_date": "Tanggal",
+            "available": "Tersedia",
+        }
+    )
+
+
+def legacy_loan_history_frame(loans):
+    df = pd.DataFrame(loans)
+    df["Nama Komputer"] = df["computers"].apply(lambda x: x["name"])
+    df["Nama Lab"] = df["computers"].apply(lambda x: x["location"])
+    df["Nama User"] = df["users"].apply(lambda x: x["name"])
+    df["NIM"] = df["users"].apply(lambda x: x["nim"])
+    df["Periode"] = [format_periode(loan) for loan in loans]
+    df = df.rename(columns={"loan_date": "Tanggal", "status": "Status"})
+    # Tanpa kolom dict embed dan kolom mentah yang tidak ditampilkan
+    return df[LOAN_COLUMNS]
+
+
+def filter_schedule(df, day, lab):
+    # Bentuk filter di Pengajuan: lab user, satu tanggal, urut nama komputer
+    df = df[df["Lokasi"] == lab]
+    return df[df["Tanggal"] == day].sort_values(by="Komputer")
+
+
+def filter_loans(df, lab):
+    return df[(df["Status"] == "approved") & (df["Nama Lab"] == lab)]
+
+
+def bench(fn, repeat):
+    """Waktu terbaik per panggilan (ms)."""
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+
+
+def mib(df):
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark frame bertipe vs object")
+    parser.add_argument("--computers", type=int, default=60)
+    parser.add_argument("--days", type=int, default=8)
+    parser.add_argument("--loans", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    computers, schedules, loans = synthetic(args.computers, args.days, args.loans)
+    day, lab = date.today() + timedelta(days=1), LABS[0]
+
+    cases = [
+        (
+            f"jadwal ({len(schedules)} baris)",
+            lambda: legacy_schedule_frame(computers, schedules),
+            lambda: schedule_frame(computers, schedules),
+            lambda df: filter_schedule(df, day, lab),
+        ),
+        (
+            f"riwayat ({len(loans)} baris)",
+            lambda: legacy_loan_history_frame(loans),
+            lambda: loan_history_frame(loans)[LOAN_COLUMNS],
+            lambda df: filter_loans(df, lab),
+        ),
+    ]
+
+    print(f"{'frame':<22}{'versi':<9}{'memori':>10}{'build':>11}{'filter':>11}")
+    for name, legacy, typed, query in cases:
+        for label, build in (("object", legacy), ("bertipe", typed)):
+            df = build()
+            print(
+                f"{name:<22}{label:<9}{mib(df):>8.2f}MB"
+                f"{bench(build, args.repeat):>9.1f}ms"
+                f"{bench(lambda: query(df), args.repeat * 4):>9.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""Load test: serbuan pengajuan saat jendela booking dibuka.
+
+N user bersamaan menjalankan alur Pengajuan lewat data layer yang sama
+dengan halaman (login -> pilih tanggal -> kirim), sementara admin
+menyetujui pengajuan. Backend memakai ``tools/fakedb.py`` (in-memory,
+dengan latency buatan), cache memakai ``MemoryCache`` kecuali ``--cache disk``.
+
+    python -m tools.loadtest --users 100 --admins 2
+    python -m tools.loadtest --users 200 --pick first --approve manual --no-exclusion
+
+Laporan: throughput, p50/p95/p99 per langkah, jumlah konflik dan double
+booking, serta panggilan backend per user.
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from database import queries
+from database.approval import run_auto_approval
+from database.auth import get_auth_metrics, verify_user
+from database.cache import DiskCache, MemoryCache, set_cache
+from database.connection import get_client, set_client
+from database.resilience import get_metrics
+from utils.config import ADMIN_PAGE_SIZE, BOOKING_WINDOW_DAYS
+from utils.intervals import IntervalIndex, booking_interval, loan_interval
+
+from .fakedb import LABS, PRODIS, FakeSupabase, seed
+
+PRODI_TO_LAB = dict(zip(PRODIS, LABS))
+
+
+class Stats:
+    """Latency per langkah dan counter kejadian, aman dipakai banyak thread."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.events = Counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def step(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.latencies[name].append(elapsed)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.events[name] += amount
+
+
+def percentiles(samples):
+    """(p50, p95, p99) dalam ms."""
+    if len(samples) == 1:
+        return (samples[0] * 1000,) * 3
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return cuts[49] * 1000, cuts[94] * 1000, cuts[98] * 1000
+
+
+def free_computers(lab, day, schedules, computers, loans):
+    """Komputer di ``lab`` yang bisa diajukan seharian di ``day`` (seperti grid)."""
+    start, end = booking_interval(day)
+    approved = IntervalIndex.from_loans(
+        loan for loan in loans if loan["status"] == "approved"
+    )
+    pending = IntervalIndex.from_loans(
+        loan for loan in loans if loan["status"] == "pending"
+    )
+    open_ids = {
+        s["computer_id"]
+        for s in schedules
+        if s["loan_date"][:10] == day.isoformat() and s["available"]
+    }
+    return [
+        c["id"]
+        for c in sorted(computers, key=lambda c: c["name"])
+        if c["location"] == lab
+        and c["id"] in open_ids
+        and not approved.overlaps(c["id"], start, end)
+        and not pending.overlaps(c["id"], start, end)
+    ]
+
+
+def user_flow(stats, nim, day, pick, rng):
+    today = date.today()
+    last = today + timedelta(days=BOOKING_WINDOW_DAYS)
+
+    with stats.step("login"):
+        check = verify_user(nim, "pw")
+        prodi = queries.get_user_prodi(check["id"])
+    user_id = check["id"]
+
+    with stats.step("pilih tanggal"):
+        computers = queries.get_computers()
+        schedules = queries.get_schedules(today.isoformat(), last.isoformat())
+        loans = queries.get_active_loans(today.isoformat(), last.isoformat())
+        free = free_computers(PRODI_TO_LAB[prodi], day, schedules, computers, loans)
+    if not free:
+        stats.count("tidak ada komputer kosong")
+        return
+    computer_id = free[0] if pick == "first" else rng.choice(free)
+
+    with stats.step("kirim"):
+        queries.get_user_prodi(user_id)
+        existing = queries.get_user_loans_overlapping(
+            user_id, day.isoformat(), day.isoformat()
+        )
+        start, end = booking_interval(day)
+        if any(s < end and e > start for s, e in map(loan_interval, existing)):
+            stats.count("pengajuan ganda ditolak")
+            return
+        # Cek ulang komputer terpilih seperti halaman sebelum create_loan
+        schedules = queries.get_computer_schedules(computer_id, day, day)
+        taken = queries.get_computer_loans(computer_id, day, day)
+        if not all(s["available"] for s in schedules) or any(
+            s < end and e > start for s, e in map(loan_interval, taken)
+        ):
+            stats.count("komputer sudah diambil saat kirim")
+            return
+        queries.create_loan(user_id, computer_id, day, day)
+    stats.count("pengajuan terkirim")
+
+
+def admin_pass(stats, day, mode):
+    """Satu putaran persetujuan oleh satu admin."""
+    with stats.step("approve"):
+        if mode == "auto":
+            try:
+                report, approved = run_auto_approval(
+                    get_client(), dates=[day.isoformat()], dry_run=False
+                )
+            except queries.SlotTaken:
+                stats.count("batch dibatalkan exclusion constraint")
+                return
+            stats.count("disetujui", len(approved))
+            stats.count(
+                "ditolak aturan auto-approval", sum(not r["approve"] for r in report)
+            )
+            return
+        # Seperti admin yang memfilter status pending lalu menekan ACC satu
+        # per satu tanpa cek tambahan
+        pending, page = [], 0
+        while True:
+            result = queries.search_loans(
+                statuses=["pending"],
+                first=day.isoformat(),
+                last=day.isoformat(),
+                page=page,
+            )
+            pending += result["rows"]
+            page += 1
+            if page * ADMIN_PAGE_SIZE >= result["total"]:
+                break
+        for loan in pending:
+            try:
+                # Hanya baris yang benar-benar berubah dihitung: admin lain
+                # bisa sudah meng-ACC pengajuan yang sama
+                if queries.approve_loan(loan):
+                    stats.count("disetujui")
+                else:
+                    stats.count("sudah diproses admin lain")
+            except queries.SlotTaken:
+                stats.count("ditolak exclusion constraint")
+
+
+def double_bookings(db):
+    """Pasangan pinjaman approved yang beririsan di komputer yang sama."""
+    by_computer = defaultdict(list)
+    for loan in db.tables["loans"]:
+        if loan["status"] == "approved":
+            by_computer[loan["computer_id"]].append(loan_interval(loan))
+    overlaps = 0
+    for intervals in by_computer.values():
+        intervals.sort()
+        for (_, end), (start, _) in zip(intervals, intervals[1:]):
+            overlaps += start < end
+    return overlaps
+
+
+def run(args):
+    db = seed(
+        FakeSupabase(latency=args.latency, enforce_exclusion=not args.no_exclusion),
+        per_lab=args.computers,
+        users=args.users,
+    )
+    set_client(db)
+    set_cache(DiskCache(tempfile.mkdtemp()) if args.cache == "disk" else MemoryCache())
+
+    stats = Stats()
+    day = date.today() + timedelta(days=args.day)
+    barrier = threading.Barrier(args.users)
+    users_done = threading.Event()
+
+    def user_thread(i):
+        rng = random.Random(args.seed + i)
+        barrier.wait()  # semua user mulai bersamaan
+        try:
+            user_flow(stats, f"23000{i}", day, args.pick, rng)
+        except Exception as exc:
+            stats.count(f"error {type(exc).__name__}")
+
+    def admin_thread():
+        while not users_done.is_set():
+            try:
+                admin_pass(stats, day, args.approve)
+            except Exception as exc:
+                stats.count(f"error admin {type(exc).__name__}")
+            users_done.wait(args.admin_interval)
+
+    # Nama thread memisahkan panggilan backend user dan admin (db.calls_by)
+    users = [
+        threading.Thread(target=user_thread, args=(i,), name=f"user-{i}")
+        for i in range(args.users)
+    ]
+    admins = [
+        threading.Thread(target=admin_thread, name=f"admin-{i}")
+        for i in range(args.admins)
+    ]
+    started = time.perf_counter()
+    for thread in users + admins:
+        thread.start()
+    for thread in users:
+        thread.join()
+    user_elapsed = time.perf_counter() - started
+    users_done.set()
+    for thread in admins:
+        thread.join()
+    # Putaran terakhir setelah semua pengajuan masuk
+    if args.admins:
+        try:
+            admin_pass(stats, day, args.approve)
+        except Exception as exc:
+            stats.count(f"error admin {type(exc).__name__}")
+    return db, stats, user_elapsed
+
+
+def report(db, stats, elapsed, args):
+    flows = len(stats.latencies["login"])
+    print(
+        f"{args.users} user, {args.admins} admin ({args.approve}), "
+        f"{args.computers} komputer/lab, latency {args.latency * 1000:.0f}ms, "
+        f"pilih={args.pick}"
+    )
+    print(f"Durasi: {elapsed:.2f}s · throughput: {flows / elapsed:.1f} user/s")
+    print()
+    print(f"{'langkah':<16}{'n':>6}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name in ["login", "pilih tanggal", "kirim", "approve"]:
+        samples = stats.latencies.get(name)
+        if samples:
+            p50, p95, p99 = percentiles(samples)
+            print(f"{name:<16}{len(samples):>6}{p50:>8.1f}ms{p95:>8.1f}ms{p99:>8.1f}ms")
+    print()
+    pending = sum(1 for loan in db.tables["loans"] if loan["status"] == "pending")
+    for name, value in sorted(stats.events.items()):
+        print(f"{name:<34}{value:>6}")
+    print(f"{'masih pending (kalah rebutan)':<34}{pending:>6}")
+    print(f"{'double booking':<34}{double_bookings(db):>6}")
+    print()
+    backend = get_metrics()
+    auth = get_auth_metrics()
+    user_calls = sum(
+        n for origin, n in db.calls_by.items() if str(origin).startswith("user-")
+    )
+    print(
+        f"Panggilan backend: {db.calls} · user {user_calls} "
+        f"({user_calls / args.users:.1f}/user) · admin {db.calls - user_calls} · "
+        f"retry {backend['retries']} · gagal {backend['failures']} · "
+        f"timeout {backend['timeouts']} · antrian penuh {backend['queue_timeouts']} · "
+        f"breaker {backend['breaker_state']}"
+    )
+    print(
+        f"Login: {auth['attempts']} percobaan, {auth['rpc_calls']} RPC, "
+        f"{auth['cache_hits']} dari cache, {auth['throttled']} dibatasi"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test serbuan pengajuan")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--admins", type=int, default=1)
+    parser.add_argument("--computers", type=int, default=20, help="Komputer per lab")
+    parser.add_argument("--day", type=int, default=1, help="Tanggal rebutan (H+n)")
+    parser.add_argument(
+        "--pick",
+        choices=["random", "first"],
+        default="random",
+        help="first = semua user mengincar komputer pertama yang kosong",
+    )
+    parser.add_argument("--approve", choices=["auto", "manual"], default="auto")
+    parser.add_argument("--admin-interval", type=float, default=0.2)
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="Round trip backend (detik)"
+    )
+    parser.add_argument("--cache", choices=["memory", "disk"], default="memory")
+    parser.add_argument(
+        "--no-exclusion",
+        action="store_true",
+        help="Tiru database tanpa exclusion constraint (migrasi 0004)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    db, stats, elapsed = run(args)
+    report(db, stats, elapsed, args)
+
+
+if __name__ == "__main__":
+    main()
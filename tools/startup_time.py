@@ -0,0 +1,104 @@
+"""Ukur biaya cold start setiap halaman.
+
+Setiap halaman dijalankan di proses Python baru (seperti worker yang baru
+restart) lewat ``streamlit.testing.v1.AppTest``, dan dilaporkan:
+
+- ``import``: waktu menjalankan statement import top-level halaman;
+- ``render 1``: render pertama (import sudah di-cache, jadi murni render +
+  panggilan backend pertama);
+- ``render 2``: rerun berikutnya dalam proses yang sama (warm).
+
+    python -m tools.startup_time
+    python -m tools.startup_time --runs 5 pages/2_📊_Daftar_Peminjaman.py
+
+Halaman memakai backend dari .env/st.secrets seperti biasa; jika backend tidak
+tersedia, kolom ``error`` berisi jumlah exception yang muncul saat render.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Dijalankan di proses anak: argv[1] = path halaman, argv[2] = timeout render
+_CHILD = """
+import ast, json, sys, time
+
+path = sys.argv[1]
+with open(path, encoding="utf-8") as f:
+    tree = ast.parse(f.read(), path)
+imports = [n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+start = time.perf_counter()
+exec(compile(ast.Module(body=imports, type_ignores=[]), path, "exec"), {})
+import_s = time.perf_counter() - start
+
+# Baru diimpor setelah import halaman diukur: AppTest ikut memuat streamlit,
+# sehingga import halaman akan terukur dari cache
+from streamlit.testing.v1 import AppTest
+
+at = AppTest.from_file(path, default_timeout=float(sys.argv[2]))
+start = time.perf_counter()
+at.run()
+first_s = time.perf_counter() - start
+start = time.perf_counter()
+at.run()
+second_s = time.perf_counter() - start
+print(json.dumps({
+    "import": import_s,
+    "render 1": first_s,
+    "render 2": second_s,
+    "error": len(at.exception),
+}))
+"""
+
+COLUMNS = ["import", "render 1", "render 2"]
+
+
+def default_pages():
+    return [ROOT / "main.py", *sorted((ROOT / "pages").glob("*.py"))]
+
+
+def measure(page, timeout=30):
+    """Satu pengukuran cold start di proses baru."""
+    proc = subprocess.run(
+        [sys.executable, "-c", _CHILD, str(page), str(timeout)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure_page(page, runs=3, timeout=30):
+    """Median dari beberapa proses baru."""
+    samples = [measure(page, timeout) for _ in range(runs)]
+    result = {col: statistics.median(s[col] for s in samples) for col in COLUMNS}
+    result["error"] = max(s["error"] for s in samples)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ukur cold start halaman Streamlit")
+    parser.add_argument("pages", nargs="*", type=Path, help="Default: semua halaman")
+    parser.add_argument("--runs", type=int, default=3, help="Jumlah proses per halaman")
+    parser.add_argument("--timeout", type=float, default=30, help="Timeout render")
+    args = parser.parse_args(argv)
+
+    pages = [p.resolve() for p in args.pages] or default_pages()
+    print(f"{'halaman':<36}" + "".join(f"{c:>11}" for c in COLUMNS) + "  error")
+    for page in pages:
+        result = measure_page(page, args.runs, args.timeout)
+        print(
+            f"{page.name:<36}"
+            + "".join(f"{result[c] * 1000:>9.0f}ms" for c in COLUMNS)
+            + f"  {result['error']:>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -17,3 +17,16 @@ def status_label(status: str):
         "returned": "📦 Dikembalikan",
     }
     return mapping.get(status, status)
+
+
+def format_periode(loan):
+    """Tampilkan periode pinjaman, mis. ``2025-01-02 s/d 2025-01-03`` atau
+    ``2025-01-02 09:00-11:00`` (jam hanya untuk booking satu hari)."""
+    start = str(loan["loan_date"])[:10]
+    end = str(loan.get("end_date") or loan["loan_date"])[:10]
+    text = start if end == start else f"{start} s/d {end}"
+    if loan.get("start_time") or loan.get("end_time"):
+        jam_mulai = str(loan.get("start_time") or "00:00")[:5]
+        jam_selesai = str(loan.get("end_time") or "24:00")[:5]
+        text += f" {jam_mulai}-{jam_selesai}"
+    return text
@@ -0,0 +1,140 @@
+"""Indeks interval terurut untuk cek ketersediaan komputer.
+
+Setiap key (mis. ``computer_id``) menyimpan interval sibuk ``[mulai, selesai)``
+yang sudah digabung sehingga saling lepas dan terurut. Cek overlap cukup
+satu bisect (O(log n)) dan pencarian slot kosong pertama dimulai dari hasil
+bisect, bukan scan per hari.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+
+
+def as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def as_time(value):
+    if value in (None, ""):
+        return None
+    if isinstance(value, time):
+        return value
+    return time.fromisoformat(str(value))
+
+
+def daterange(start, end):
+    """Semua tanggal dari ``start`` sampai ``end`` (inklusif)."""
+    day = as_date(start)
+    end = as_date(end)
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def booking_interval(start_date, end_date=None, start_time=None, end_time=None):
+    """Interval ``[mulai, selesai)`` sebuah booking.
+
+    Tanpa jam berarti seharian penuh; ``end_date`` kosong berarti satu hari.
+    Jam hanya boleh untuk booking satu hari (``loans_periode_check``), jadi
+    booking multi-hari selalu seharian penuh di setiap harinya.
+    """
+    start_day = as_date(start_date)
+    end_day = as_date(end_date or start_date)
+    start_time = as_time(start_time)
+    end_time = as_time(end_time)
+    start = datetime.combine(start_day, start_time or time.min)
+    if end_time is None:
+        end = datetime.combine(end_day + timedelta(days=1), time.min)
+    else:
+        end = datetime.combine(end_day, end_time)
+    return start, end
+
+
+def loan_interval(loan):
+    """Interval ``[mulai, selesai)`` dari satu baris tabel ``loans``."""
+    return booking_interval(
+        loan["loan_date"],
+        loan.get("end_date"),
+        loan.get("start_time"),
+        loan.get("end_time"),
+    )
+
+
+class IntervalIndex:
+    """Interval sibuk per key, disimpan sebagai list ``starts``/``ends`` terurut."""
+
+    def __init__(self):
+        self._starts = {}
+        self._ends = {}
+
+    @classmethod
+    def from_loans(cls, loans, key="computer_id"):
+        index = cls()
+        for loan in loans:
+            index.add(loan[key], *loan_interval(loan))
+        return index
+
+    def add(self, key, start, end):
+        """Tambah interval; interval yang beririsan/bersambung digabung."""
+        if end <= start:
+            return
+        starts = self._starts.setdefault(key, [])
+        ends = self._ends.setdefault(key, [])
+        # Interval ke-lo..hi-1 menyentuh [start, end]
+        lo = bisect_left(ends, start)
+        hi = bisect_right(starts, end)
+        if lo < hi:
+            start = min(start, starts[lo])
+            end = max(end, ends[hi - 1])
+        starts[lo:hi] = [start]
+        ends[lo:hi] = [end]
+
+    def overlaps(self, key, start, end):
+        """Apakah ``[start, end)`` beririsan dengan interval sibuk ``key``."""
+        starts = self._starts.get(key)
+        if not starts:
+            return False
+        # Interval terakhir yang mulai sebelum `end`; yang lebih awal
+        # pasti selesai lebih awal karena interval saling lepas.
+        i = bisect_left(starts, end) - 1
+        return i >= 0 and self._ends[key][i] > start
+
+    def first_free(self, key, earliest, latest, duration, days=None):
+        """Waktu mulai paling awal >= ``earliest`` dengan slot kosong selama
+        ``duration`` yang selesai paling lambat ``latest``; None jika tidak ada.
+
+        ``days`` (opsional): tanggal yang boleh dipakai (mis. jadwal harian
+        yang tersedia); slot yang menyentuh tanggal lain dilewati.
+        """
+        starts = self._starts.get(key, [])
+        ends = self._ends.get(key, [])
+        t = earliest
+        while True:
+            i = bisect_right(ends, t)
+            while i < len(starts) and starts[i] < t + duration:
+                t = max(t, ends[i])
+                i += 1
+            if t + duration > latest:
+                return None
+            if days is None:
+                return t
+            # Slot [t, t + duration) mencakup tanggal t s.d. sebelum selesai
+            closed = [
+                day
+                for day in daterange(t, t + duration - timedelta(microseconds=1))
+                if day not in days
+            ]
+            if not closed:
+                return t
+            t = datetime.combine(closed[-1] + timedelta(days=1), time.min)
+
+    def busy(self, key):
+        """Daftar interval sibuk ``key`` (terurut)."""
+        return list(zip(self._starts.get(key, []), self._ends.get(key, [])))
+
+    def __len__(self):
+        return sum(len(starts) for starts in self._starts.values())
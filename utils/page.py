@@ -0,0 +1,63 @@
+"""Bootstrap bersama untuk ``main.py`` dan semua halaman.
+
+Satu sumber untuk tema (CSS) dan konfigurasi. Modul ini sengaja ringan:
+jangan impor pandas/supabase di sini, halaman mengimpor yang berat hanya
+di bagian yang benar-benar membutuhkannya.
+"""
+
+from html import escape
+
+import streamlit as st
+
+# Impor config memuat .env sekali per proses
+from utils import config  # noqa: F401
+
+THEME_CSS = """
+<style>
+.stApp { background-color: #0A0F29; color: #FFD700; margin: 0 auto;}
+section[data-testid="stSidebar"] { background-color: #FFFFFF; color: #000000; }
+section[data-testid="stSidebar"] * { color: #000000 !important; }
+.computer-card { border-radius: 10px; padding: 15px; margin: 5px; text-align: center; font-weight: bold; }
+.available { background-color: #006400; color: #FFFFFF; }
+.not-available { background-color: #8B0000; color: #FFFFFF; }
+.pending { background-color: #B45309; color: #FFFFFF; }
+.computer-grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(170px, 1fr)); gap: 10px; }
+.computer-grid .computer-card { margin: 0; }
+.computer-card p { color: #FFFFFF !important; }
+.stButton>button {
+    color: #065F46;
+    background-color: #A3E635;  /* Mengatur warna latar belakang tombol */
+}
+</style>
+"""
+
+
+def apply_theme():
+    """Sisipkan CSS tema; dipanggil sekali di awal setiap halaman."""
+    st.markdown(THEME_CSS, unsafe_allow_html=True)
+
+
+CARD_STATUS = {
+    "available": "✅ Available",
+    "pending": "❌ Sedang diajukan user lain",
+    "not-available": "❌ Tidak Tersedia",
+}
+
+
+def computer_grid_html(cards):
+    """Grid kartu komputer sebagai satu blok HTML.
+
+    ``cards`` berisi dict ``name``, ``location``, ``status`` (key
+    ``CARD_STATUS``, sekaligus class CSS) dan ``note`` opsional.
+    """
+    items = "".join(
+        f'<div class="computer-card {card["status"]}">'
+        '<div style="font-size:40px;">🖥️</div>'
+        f"<div>{escape(str(card['name']))}</div>"
+        f'<div style="font-size:14px;">{CARD_STATUS[card["status"]]}</div>'
+        f'<div style="font-size:12px;">{escape(str(card["location"]))}</div>'
+        f'<div style="font-size:12px;">{escape(card.get("note") or "")}</div>'
+        "</div>"
+        for card in cards
+    )
+    return f'<div class="computer-grid">{items}</div>'
@@ -0,0 +1,143 @@
+"""Snapshot ketersediaan komputer per tanggal di ``st.session_state``.
+
+Dulu setiap tanggal yang dibuka membuat dict ``status_komputer_{tanggal}``
+berisi satu bool Python per komputer dan tidak pernah dibuang. Sekarang
+setiap sesi punya satu ``AvailabilityCache``:
+
+- per tanggal hanya dua bitset (``bytearray``): komputer yang sudah dicatat
+  dan yang tersedia; posisi bit per komputer dipakai bersama semua tanggal;
+- LRU: tanggal yang paling lama tidak dibuka dibuang saat jumlah tanggal
+  melebihi ``SESSION_CACHE_DATES`` atau ukurannya melebihi
+  ``SESSION_CACHE_BYTES``;
+- setiap cache terdaftar di registry ``WeakSet`` per proses sehingga
+  Admin Dashboard bisa melihat total memori semua sesi aktif. Sesi yang
+  berakhir otomatis hilang dari registry. Karena dibaca dari thread sesi
+  lain, setiap cache punya lock sendiri.
+"""
+
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+import streamlit as st
+
+from utils.config import SESSION_CACHE_BYTES, SESSION_CACHE_DATES
+
+SESSION_KEY = "availability_cache"
+
+_registry = weakref.WeakSet()
+_registry_lock = threading.Lock()
+
+
+class AvailabilityCache:
+    def __init__(self, max_dates=SESSION_CACHE_DATES, max_bytes=SESSION_CACHE_BYTES):
+        self.max_dates = max_dates
+        self.max_bytes = max_bytes
+        self._slots = {}  # computer_id -> posisi bit
+        self._dates = OrderedDict()  # tanggal ISO -> (known, available)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.add(self)
+
+    def _slot(self, computer_id):
+        slot = self._slots.get(computer_id)
+        if slot is None:
+            slot = self._slots[computer_id] = len(self._slots)
+        return slot
+
+    def _bits(self, day):
+        key = str(day)[:10]
+        bits = self._dates.get(key)
+        if bits is None:
+            self.misses += 1
+            bits = self._dates[key] = (bytearray(), bytearray())
+        else:
+            self.hits += 1
+            self._dates.move_to_end(key)
+        return bits
+
+    def remember(self, day, items):
+        """Catat ``(computer_id, tersedia)`` yang belum punya snapshot di ``day``."""
+        with self._lock:
+            known, available = self._bits(day)
+            for computer_id, is_available in items:
+                byte, mask = divmod(self._slot(computer_id), 8)
+                mask = 1 << mask
+                if byte >= len(known):
+                    grow = byte + 1 - len(known)
+                    known.extend(bytes(grow))
+                    available.extend(bytes(grow))
+                if known[byte] & mask:
+                    continue
+                known[byte] |= mask
+                if is_available:
+                    available[byte] |= mask
+            self._evict()
+
+    def get(self, day, computer_id, default=None):
+        """Snapshot ketersediaan ``computer_id`` di ``day``, atau ``default``."""
+        with self._lock:
+            bits = self._dates.get(str(day)[:10])
+            slot = self._slots.get(computer_id)
+        if bits is None or slot is None:
+            return default
+        known, available = bits
+        byte, mask = divmod(slot, 8)
+        if byte >= len(known) or not known[byte] & (1 << mask):
+            return default
+        return bool(available[byte] & (1 << mask))
+
+    def nbytes(self):
+        """Perkiraan memori yang dipakai cache ini (byte)."""
+        with self._lock:
+            return self._nbytes()
+
+    def _nbytes(self):
+        total = sys.getsizeof(self._slots) + sys.getsizeof(self._dates)
+        for key, (known, available) in self._dates.items():
+            total += sys.getsizeof(key) + sys.getsizeof(known)
+            total += sys.getsizeof(available)
+        return total
+
+    def _evict(self):
+        # Tanggal yang terakhir dibuka selalu dipertahankan
+        while len(self._dates) > 1 and (
+            len(self._dates) > self.max_dates or self._nbytes() > self.max_bytes
+        ):
+            self._dates.popitem(last=False)
+            self.evictions += 1
+
+    def report(self):
+        with self._lock:
+            return {
+                "dates": len(self._dates),
+                "computers": len(self._slots),
+                "bytes": self._nbytes(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def session_availability():
+    """Cache ketersediaan milik sesi Streamlit yang sedang berjalan."""
+    if SESSION_KEY not in st.session_state:
+        st.session_state[SESSION_KEY] = AvailabilityCache()
+    return st.session_state[SESSION_KEY]
+
+
+def sessions_report():
+    """Ringkasan memori semua sesi aktif di proses ini."""
+    with _registry_lock:
+        reports = [cache.report() for cache in list(_registry)]
+    return {
+        "sessions": len(reports),
+        "dates": sum(r["dates"] for r in reports),
+        "bytes": sum(r["bytes"] for r in reports),
+        "max_bytes": max((r["bytes"] for r in reports), default=0),
+        "evictions": sum(r["evictions"] for r in reports),
+    }